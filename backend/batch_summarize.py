@@ -0,0 +1,75 @@
+"""
+Regenerate medical summaries for stored transcripts
+
+Reads transcripts from the transcript store (default) or from JSON/JSONL
+files, summarises them with bounded concurrency under the Groq rate limit
+and appends validated MedicalSummary records to a JSONL file. Re-running
+with the same output file resumes where the last run stopped.
+
+Usage (from backend/):
+    python batch_summarize.py [--input transcripts.jsonl] [--output data/summaries.jsonl]
+                              [--concurrency 4] [--rpm 30] [--retries 3] [--write-back]
+                              [--tenant clinic-a]
+"""
+import argparse
+import asyncio
+
+from config import settings
+from services.batch_summarizer import BatchSummarizer, iter_store_transcripts, load_transcript_files
+from services.tenants import TenantRegistry
+from services.transcript_store import TranscriptStore
+from utils.log import setup_logging
+
+
+async def run(args) -> int:
+    store = None
+    if not args.input or args.write_back:
+        store = TranscriptStore(db_path=args.db)
+        await store.start()
+    try:
+        if args.input:
+            transcripts = load_transcript_files(args.input)
+        else:
+            transcripts = [item async for item in iter_store_transcripts(store)]
+
+        summarizer = BatchSummarizer(
+            TenantRegistry.load().services(args.tenant).groq,
+            args.output,
+            concurrency=args.concurrency,
+            requests_per_minute=args.rpm,
+            max_retries=args.retries,
+            store=store if args.write_back else None,
+        )
+        result = await summarizer.run(transcripts)
+    finally:
+        if store:
+            await store.stop()
+
+    print(f"{result.total} transcripts: {result.succeeded} summarised, "
+          f"{result.skipped} skipped, {result.failed} failed")
+    print(f"{result.elapsed:.1f} s, {result.summaries_per_minute:.1f} summaries/min")
+    if result.failed:
+        print(f"Failures logged to {summarizer.errors_path}; re-run to retry them")
+    return 1 if result.failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--input", help="JSON/JSONL file or directory (default: transcript store)")
+    parser.add_argument("--db", default=settings.transcript_db_path, help="transcript store database")
+    parser.add_argument("--output", default=settings.batch_summary_output)
+    parser.add_argument("--concurrency", type=int, default=settings.batch_summary_concurrency)
+    parser.add_argument("--rpm", type=float, default=settings.groq_requests_per_minute,
+                        help="Groq requests per minute")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--tenant", help="use this tenant's Groq model and key (default tenant if omitted)")
+    parser.add_argument("--write-back", action="store_true",
+                        help="also save summaries to the transcript store")
+    args = parser.parse_args()
+
+    setup_logging(level=settings.log_level, json_format=settings.log_format == "json")
+    raise SystemExit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
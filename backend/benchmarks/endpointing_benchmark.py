@@ -0,0 +1,184 @@
+"""
+Replay benchmark for turn endpointing
+
+Replays synthetic sessions (speakers with different pause habits) and
+compares end-of-turn policies in the two ways audio reaches the backend:
+
+* client-endpointed: the frontend VAD waits for 3 s of silence and sends
+  the whole utterance as one message (what the shipped frontend does).
+  Deepgram transcribes it UPLOAD_SPEEDUP times faster than real time and
+  emits a final result at every pause longer than its endpointing; every
+  response takes a network round trip. A Finalize flush takes a lognormal
+  time around --flush-ms, and a fraction --flush-loss of flushes never
+  answer (the turn then ends on FINALIZE_TIMEOUT). Latency is the time from
+  the upload to the end of the turn.
+* streaming: audio arrives in real time. Latency is the silence waited
+  after the last word; a cut-off is a turn closed during a pause.
+
+Policies:
+  prior         end the turn on every Deepgram is_final (default 10 ms
+                endpointing; gaps under 120 ms are not treated as pauses)
+  speech_final  end the turn on speech_final with the configured endpointing
+  timer         hold each final for the adaptive threshold minus the silence
+                Deepgram already waited (wall clock, both modes)
+  adaptive      client-endpointed: Finalize after the upload and end on the
+                flushed result; streaming: adaptive threshold on top of
+                speech_final
+
+Usage (from backend/):
+    python benchmarks/endpointing_benchmark.py [--sessions 500]
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from services.deepgram_service import FINALIZE_TIMEOUT
+from services.endpointing import AdaptiveEndpointer
+
+# Deepgram does not split on gaps shorter than this, whatever the endpointing
+MIN_SPLIT_GAP = 0.12
+# Transcription speed of an uploaded utterance relative to real time
+UPLOAD_SPEEDUP = 10.0
+# Network round trip to Deepgram (seconds)
+ROUND_TRIP = 0.08
+
+
+def synthetic_session(rng: random.Random, turns: int):
+    """
+    Return a list of turns, each a list of (start, end) word timings
+
+    Each speaker gets their own typical pause length; most word gaps are
+    short, a few are hesitation pauses drawn around that typical length.
+    """
+    typical_pause = rng.uniform(0.2, 0.9)
+    clock = 0.0
+    session = []
+    for _ in range(turns):
+        words = []
+        for _ in range(rng.randint(4, 25)):
+            if words and rng.random() < 0.15:
+                clock += rng.lognormvariate(0, 0.35) * typical_pause
+            else:
+                clock += rng.uniform(0.02, 0.1)
+            duration = rng.uniform(0.15, 0.45)
+            words.append((clock, clock + duration))
+            clock += duration
+        session.append(words)
+        clock += rng.uniform(3.0, 6.0)  # assistant reply
+    return session
+
+
+def gaps(words):
+    return [word[0] - prev[1] for prev, word in zip(words, words[1:])]
+
+
+def replay_streaming(sessions, policy: str, endpointing: float):
+    """Mean silence waited after the last word, and cut-off rate"""
+    latency_total, turns, cutoffs = 0.0, 0, 0
+    for session in sessions:
+        endpointer = AdaptiveEndpointer(adaptive=policy in ("timer", "adaptive"))
+        for words in session:
+            turns += 1
+            cut = False
+            endpointer.observe_words(words[:1])
+            for prev, word in zip(words, words[1:]):
+                gap = word[0] - prev[1]
+                if policy == "prior":
+                    needed = max(endpointing, MIN_SPLIT_GAP)
+                elif policy == "speech_final":
+                    needed = endpointing
+                else:
+                    needed = max(endpointing, endpointer.threshold)
+                if gap >= needed:
+                    # Turn closed mid-utterance; speaker resumes after the pause
+                    cut = True
+                    endpointer.end_turn()
+                    endpointer.observe_speech_start(word[0])
+                endpointer.observe_words([word])
+            cutoffs += cut
+            if policy == "prior":
+                latency_total += max(endpointing, MIN_SPLIT_GAP)
+            elif policy == "speech_final":
+                latency_total += endpointing
+            else:
+                latency_total += max(endpointing, endpointer.threshold)
+            endpointer.end_turn()
+    return latency_total / turns, cutoffs / turns
+
+
+def replay_uploaded(sessions, policy: str, endpointing: float, flush: float = 0.15,
+                    flush_loss: float = 0.0, seed: int = 0):
+    """Mean time from upload to end of turn, and split rate"""
+    rng = random.Random(seed)
+    latency_total, turns, splits = 0.0, 0, 0
+    for session in sessions:
+        endpointer = AdaptiveEndpointer(adaptive=True)
+        for words in session:
+            turns += 1
+            endpointer.observe_words(words)
+            # Audio up to the end of the silence Deepgram needs after the last word
+            split_gap = max(endpointing, MIN_SPLIT_GAP)
+            audio = words[-1][1] - words[0][0] + split_gap
+            last_final = audio / UPLOAD_SPEEDUP + ROUND_TRIP
+            internal_finals = [g for g in gaps(words) if g >= split_gap]
+            if policy == "prior":
+                # Each internal final closes a turn before the utterance is complete
+                splits += bool(internal_finals)
+                latency_total += last_final
+            elif policy == "timer":
+                hold = max(0.0, endpointer.threshold - endpointing)
+                splits += any(g / UPLOAD_SPEEDUP > hold for g in internal_finals)
+                latency_total += last_final + hold
+            elif rng.random() < flush_loss:
+                # Lost flush: the final results still arrive, each re-arming the timeout
+                splits += any(g / UPLOAD_SPEEDUP > FINALIZE_TIMEOUT for g in internal_finals)
+                latency_total += last_final + FINALIZE_TIMEOUT
+            else:
+                # Flushed result covers all audio sent; no trailing silence is needed
+                spoken = words[-1][1] - words[0][0]
+                latency_total += spoken / UPLOAD_SPEEDUP + ROUND_TRIP + rng.lognormvariate(0, 0.5) * flush
+            endpointer.end_turn()
+    return latency_total / turns, splits / turns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--endpointing-ms", type=int, default=settings.deepgram_endpointing_ms)
+    parser.add_argument("--flush-ms", type=float, default=150, help="median Finalize flush time")
+    parser.add_argument("--flush-loss", type=float, default=0.01, help="fraction of flushes never answered")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sessions = [synthetic_session(rng, args.turns) for _ in range(args.sessions)]
+    endpointing = args.endpointing_ms / 1000
+    prior_endpointing = 0.01
+
+    print(f"{'client-endpointed':<20}{'latency':>10}{'split rate':>14}")
+    for name, policy, ep in [
+        ("prior (is_final)", "prior", prior_endpointing),
+        ("timer", "timer", endpointing),
+        ("adaptive", "adaptive", endpointing),
+    ]:
+        latency, rate = replay_uploaded(sessions, policy, ep, args.flush_ms / 1000, args.flush_loss, args.seed)
+        print(f"{name:<20}{latency * 1000:>7.0f} ms{rate * 100:>13.1f}%")
+
+    print()
+    print(f"{'streaming':<20}{'latency':>10}{'cut-off rate':>14}")
+    for name, policy, ep in [
+        ("prior (is_final)", "prior", prior_endpointing),
+        (f"speech_final {args.endpointing_ms} ms", "speech_final", endpointing),
+        ("adaptive", "adaptive", endpointing),
+    ]:
+        latency, rate = replay_streaming(sessions, policy, ep)
+        print(f"{name:<20}{latency * 1000:>7.0f} ms{rate * 100:>13.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Cold-start benchmark: time to import the application module
+
+Imports `main` in fresh interpreters and reports the median wall time plus
+the slowest modules from `python -X importtime`. Exits non-zero when the
+median exceeds --target-ms, so it can gate CI.
+
+Usage (from backend/):
+    python benchmarks/import_benchmark.py [--runs 10] [--target-ms 800]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIMED_IMPORT = (
+    "import time; start = time.perf_counter(); import main; "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+
+def time_import() -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", TIMED_IMPORT],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_modules(count: int):
+    """Top-level imports of `main` ranked by cumulative import time"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    # Children are listed before their parent; collect depth-1 entries
+    # until the depth-0 "main" line closes them
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == "main":
+                break
+            rows = []
+        elif depth == 1:
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target-ms", type=float, default=800.0)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    samples = [time_import() for _ in range(args.runs)]
+    median = statistics.median(samples)
+
+    print(f"import main: median {median:.0f} ms, min {min(samples):.0f} ms, "
+          f"max {max(samples):.0f} ms ({args.runs} runs)")
+    print("Slowest direct imports:")
+    for cumulative, name in slowest_modules(args.top):
+        print(f"  {cumulative:8.1f} ms  {name}")
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, main; "
+         "print(','.join(m for m in ('deepgram', 'groq', 'elevenlabs') if m in sys.modules))"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    print(f"Provider SDKs loaded at import: {loaded or 'none'}")
+
+    if median > args.target_ms:
+        print(f"FAIL: median import time {median:.0f} ms exceeds target {args.target_ms:.0f} ms")
+        sys.exit(1)
+    print(f"OK: within target {args.target_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Event-loop lag with logging off, synchronous, and queue-based
+
+Simulates many sessions that log every audio frame (20 ms) plus a
+keepalive every 5 s, while a monitor task measures how late a 10 ms timer
+fires. Logging goes to a file wrapped with a per-write delay that models a
+stdout pipe under backpressure (container log driver, slow terminal).
+
+Usage (from backend/):
+    python benchmarks/logging_benchmark.py [--sessions 300] [--seconds 5] [--sink-latency-us 50]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.log import JsonFormatter, SessionContextFilter, bind_session, get_logger, setup_logging, stop_logging
+
+
+FRAME_INTERVAL = 0.02
+MONITOR_INTERVAL = 0.01
+
+
+class SlowSink:
+    """File stream whose writes block for a fixed time"""
+
+    def __init__(self, stream, latency: float):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, data: str):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+
+
+async def session(index: int, stop_at: float):
+    bind_session(f"session-{index}")
+    audio_logger = get_logger("audio")
+    keepalive_logger = get_logger("deepgram.keepalive")
+    next_keepalive = time.monotonic() + 5
+    while time.monotonic() < stop_at:
+        audio_logger.info("Received binary audio", extra={"bytes": 640})
+        if time.monotonic() >= next_keepalive:
+            keepalive_logger.info("Keepalive sent")
+            next_keepalive += 5
+        await asyncio.sleep(FRAME_INTERVAL)
+
+
+async def monitor(stop_at: float):
+    lags = []
+    while time.monotonic() < stop_at:
+        start = time.perf_counter()
+        await asyncio.sleep(MONITOR_INTERVAL)
+        lags.append((time.perf_counter() - start - MONITOR_INTERVAL) * 1000)
+    return lags
+
+
+async def run(sessions: int, seconds: float):
+    stop_at = time.monotonic() + seconds
+    monitor_task = asyncio.create_task(monitor(stop_at))
+    await asyncio.gather(*(session(i, stop_at) for i in range(sessions)))
+    return await monitor_task
+
+
+def configure(mode: str, stream):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    stop_logging()
+    if mode == "off":
+        root.setLevel(logging.CRITICAL)
+    elif mode == "sync":
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(JsonFormatter())
+        handler.addFilter(SessionContextFilter())
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    elif mode == "async":
+        setup_logging(level="INFO", stream=stream)
+    elif mode == "async+sampled":
+        setup_logging(level="INFO", stream=stream, sample_rates={"audio": 0.01})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--sink-latency-us", type=float, default=50.0)
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions, {args.seconds:.0f} s per mode, "
+          f"{args.sink_latency_us:.0f} us per write")
+    print(f"{'mode':<16}{'p50 lag':>10}{'p99 lag':>10}{'max lag':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("off", "sync", "async", "async+sampled"):
+            with open(os.path.join(tmp, f"{mode}.log"), "w") as f:
+                stream = SlowSink(f, args.sink_latency_us / 1e6)
+                configure(mode, stream)
+                lags = asyncio.run(run(args.sessions, args.seconds))
+                configure("off", stream)
+            lags.sort()
+            p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+            print(f"{mode:<16}{statistics.median(lags):>8.2f}ms{p99:>8.2f}ms{lags[-1]:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Outbound WebSocket traffic: one task per message vs the priority outbox
+
+Simulates a turn on a slow client link: a burst of interim transcripts
+(one every 20 ms) arriving while a large audio payload from the previous
+turn is being written, followed by a final transcript and status update.
+The socket is modelled as a lock plus a per-byte delay, like a congested
+TCP connection.
+
+Usage (from backend/):
+    python benchmarks/outbox_benchmark.py [--interims 100] [--kbps 500] [--audio-kb 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.outbox import WebSocketOutbox
+
+
+INTERIM_INTERVAL = 0.02
+
+
+class SlowSocket:
+    """Serialised socket that takes time proportional to payload size"""
+
+    def __init__(self, kbps: float):
+        self.bytes_per_s = kbps * 1000 / 8
+        self.lock = asyncio.Lock()
+        self.sent = []
+
+    async def send_json(self, message):
+        data = json.dumps(message)
+        async with self.lock:
+            await asyncio.sleep(len(data) / self.bytes_per_s)
+            self.sent.append((time.perf_counter(), message))
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def scenario(socket: SlowSocket, send, interims: int, audio_kb: int):
+    start = time.perf_counter()
+    await send({"type": "audio", "data": "x" * audio_kb * 1024, "format": "mp3"})
+    for i in range(interims):
+        await send({"type": "transcript", "text": f"partial {i} " * 8, "is_final": False})
+        await asyncio.sleep(INTERIM_INTERVAL)
+    final_at = time.perf_counter()
+    await send({"type": "transcript", "text": "final text", "is_final": True})
+    await send({"type": "status", "status": "thinking"})
+    return start, final_at
+
+
+async def run_tasks(interims: int, kbps: float, audio_kb: int):
+    socket = SlowSocket(kbps)
+    tasks = []
+
+    async def send(message):
+        tasks.append(asyncio.create_task(socket.send_json(message)))
+
+    start, final_at = await scenario(socket, send, interims, audio_kb)
+    await asyncio.gather(*tasks)
+    return socket, start, final_at, len(tasks)
+
+
+async def run_outbox(interims: int, kbps: float, audio_kb: int):
+    socket = SlowSocket(kbps)
+    outbox = WebSocketOutbox(socket)
+    outbox.start()
+    start, final_at = await scenario(socket, outbox.send, interims, audio_kb)
+    await outbox.close(drain_timeout=60)
+    return socket, start, final_at, 1
+
+
+def report(name: str, socket: SlowSocket, start: float, final_at: float, tasks: int):
+    sent = socket.sent
+    transcripts = [(t, m) for t, m in sent if m["type"] == "transcript"]
+    final_time = next(t for t, m in transcripts if m["is_final"])
+    status_time = next(t for t, m in sent if m["type"] == "status")
+    print(f"{name:<12}{tasks:>7}{len(transcripts):>13}{(final_time - final_at) * 1000:>12.0f}ms"
+          f"{(status_time - final_at) * 1000:>12.0f}ms{sent[-1][0] - start:>9.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--interims", type=int, default=100)
+    parser.add_argument("--kbps", type=float, default=500)
+    parser.add_argument("--audio-kb", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.interims} interims, {args.audio_kb} KB audio, {args.kbps:.0f} kbit/s link")
+    print(f"{'mode':<12}{'tasks':>7}{'transcripts':>13}{'final lat':>14}{'status lat':>14}{'total':>10}")
+    report("per-task", *asyncio.run(run_tasks(args.interims, args.kbps, args.audio_kb)))
+    report("outbox", *asyncio.run(run_outbox(args.interims, args.kbps, args.audio_kb)))
+
+
+if __name__ == "__main__":
+    main()
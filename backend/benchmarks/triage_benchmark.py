@@ -0,0 +1,75 @@
+"""
+Throughput benchmark for the local emergency triage matcher
+
+Replays synthetic Deepgram-style transcript streams (growing interim
+results followed by a final result) through EmergencyTriage.check.
+
+Usage (from backend/):
+    python benchmarks/triage_benchmark.py [--utterances 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.triage import EmergencyTriage
+
+
+UTTERANCES = [
+    "I have had a really bad headache for the past three days",
+    "my stomach hurts after I eat and sometimes I feel nauseous",
+    "I don't have any chest pain but my back is sore",
+    "I've been coughing a lot and I feel kind of short of breath",
+    "my knee has been swollen since I went running on Sunday",
+    "I feel dizzy when I stand up too quickly in the morning",
+    "there is a pressure in my chest and my left arm feels weird",
+    "I have never had a seizure before but I feel really tired",
+    "my daughter has a fever and a rash on her arms",
+    "I think my wife is having a stroke her face is drooping",
+]
+
+
+def transcript_stream(count: int, seed: int = 0):
+    """Yield (text, is_final) pairs the way Deepgram emits them"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        words = rng.choice(UTTERANCES).split()
+        step = rng.randint(2, 4)
+        for end in range(step, len(words), step):
+            yield " ".join(words[:end]), False
+        yield " ".join(words), True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--utterances", type=int, default=20000)
+    args = parser.parse_args()
+
+    triage = EmergencyTriage()
+    stream = list(transcript_stream(args.utterances))
+    total_chars = sum(len(text) for text, _ in stream)
+
+    # Warm up
+    for text, _ in stream[:1000]:
+        triage.check(text)
+
+    hits = 0
+    start = time.perf_counter()
+    for text, _ in stream:
+        if triage.check(text):
+            hits += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"Transcripts:   {len(stream)} ({args.utterances} utterances)")
+    print(f"Emergency hits: {hits}")
+    print(f"Elapsed:       {elapsed:.3f} s")
+    print(f"Throughput:    {len(stream) / elapsed:,.0f} transcripts/s, "
+          f"{total_chars / elapsed / 1e6:.2f} MB/s")
+    print(f"Mean latency:  {elapsed / len(stream) * 1e6:.1f} us/transcript")
+
+
+if __name__ == "__main__":
+    main()
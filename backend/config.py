@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict
 import os
 
 class Settings(BaseSettings):
@@ -11,20 +12,75 @@ class Settings(BaseSettings):
     # Server
     backend_port: int = 8000
     frontend_url: str = "http://localhost:3000"
+    log_level: str = "INFO"
+    log_format: str = "json"  # "json" or "text"
+    log_queue_size: int = 10000  # records buffered before new ones are dropped
+    # Per-category sampling (fraction kept) and rate limits (records/second)
+    log_sample_rates: Dict[str, float] = {"audio": 0.01}
+    log_rate_limits: Dict[str, float] = {"transcript": 20.0, "deepgram": 50.0}
+    readiness_timeout: float = 15.0  # seconds per startup check
+    readiness_max_retry_delay: float = 60.0  # backoff cap for re-running failed checks
+    outbox_audio_queue_size: int = 4  # queued audio payloads before senders wait
+    outbox_send_timeout: float = 10.0  # close the socket if one send takes longer
+
+    # Runtime diagnostics
+    loop_monitor_enabled: bool = True
+    loop_slow_callback_ms: int = 100  # report loop stalls longer than this
+    admin_endpoints_enabled: bool = False  # /debug/* and /admin/* endpoints
+    admin_token: str = ""  # required in X-Admin-Token; mandatory with admin endpoints
 
     # Deepgram settings
     deepgram_model: str = "nova-2"
     deepgram_language: str = "en"
+    deepgram_endpointing_ms: int = 300  # silence before Deepgram marks speech_final
+    deepgram_utterance_end_ms: int = 1000  # word gap before an UtteranceEnd event (min 1000)
+    deepgram_vad_events: bool = True  # emit SpeechStarted events
+
+    # Adaptive turn endpointing (on top of Deepgram's endpointing)
+    endpointing_adaptive: bool = True
+    endpointing_initial_silence_ms: int = 900
+    endpointing_min_silence_ms: int = 300
+    endpointing_max_silence_ms: int = 1800
+    endpointing_pause_percentile: float = 0.9
+    endpointing_margin_ms: int = 200
 
     # Groq settings
     groq_model: str = "llama-3.3-70b-versatile"
     groq_max_tokens: int = 300
     groq_temperature: float = 0.7
+    groq_requests_per_minute: float = 30.0  # batch summarisation rate limit
+    batch_summary_concurrency: int = 4
+    batch_summary_output: str = "data/summaries.jsonl"
 
     # ElevenLabs settings
     elevenlabs_voice_id: str = "21m00Tcm4TlvDq8ikWAM"  # Rachel voice
     elevenlabs_model: str = "eleven_turbo_v2_5"
 
+    # Multi-tenant profiles
+    tenant_profiles_path: str = ""  # JSON file: {"<tenant id>": {<TenantProfile fields>}}
+    default_tenant: str = "default"  # used when /ws has no ?tenant=
+    tenant_max_sessions: int = 0  # default per-tenant session quota (0 = unlimited)
+    tenant_pool_size: int = 16  # tenants whose provider clients stay loaded
+    tenant_idle_ttl: float = 600.0  # seconds before an idle tenant's clients are evicted
+
+    # Transcript persistence
+    transcript_db_path: str = "data/transcripts.db"
+    transcript_segment_dir: str = "data/segments"
+    transcript_flush_interval: float = 0.5  # seconds
+    transcript_flush_batch_size: int = 64
+
+    # Semantic response cache (opt-in)
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.9  # cosine similarity
+    semantic_cache_ttl: float = 3600.0  # seconds
+    semantic_cache_max_entries: int = 256
+    semantic_cache_max_user_turns: int = 1
+    semantic_cache_embedding_model: str = ""  # e.g. "BAAI/bge-small-en-v1.5" (needs fastembed)
+
+    # Speculative LLM generation on stable interim transcripts
+    speculation_enabled: bool = True
+    speculation_stable_window: float = 0.4  # seconds without a new interim result
+
     class Config:
         env_file = "../.env"
         env_file_encoding = "utf-8"
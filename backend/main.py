@@ -1,32 +1,61 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import asyncio
 import json
+import secrets
+import threading
 import base64
 import sys
-import logging
-
-# Configure logging to see output immediately
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__name__)
+from typing import Optional
 
 from config import settings
-from services.deepgram_service import DeepgramService
-from services.groq_service import GroqService
-from services.elevenlabs_service import ElevenLabsService
+from utils.log import setup_logging, stop_logging, bind_session, get_logger
+from utils.diagnostics import LoopMonitor, SamplingProfiler
+
+setup_logging(
+    level=settings.log_level,
+    json_format=settings.log_format == "json",
+    sample_rates=settings.log_sample_rates,
+    rate_limits=settings.log_rate_limits,
+    queue_size=settings.log_queue_size,
+)
+logger = get_logger("session")
+transcript_logger = get_logger("transcript")
+audio_logger = get_logger("audio")
+
+from services.elevenlabs_service import EMERGENCY_MESSAGE, GREETING_MESSAGE
 from services.session_manager import SessionManager
+from services.transcript_store import TranscriptStore
+from services.triage import EmergencyTriage
+from services.speculation import SpeculativeResponder, SpeculationMetrics
+from services.readiness import ReadinessProbe
+from services.outbox import WebSocketOutbox, OutboxMetrics, CONTROL
+from services.tenants import TenantRegistry, TenantQuotaExceeded, UnknownTenantError
+from services.batch_summarizer import BatchSummarizer, iter_store_transcripts
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler"""
-    print("=" * 50)
-    print("Starting MediVoice Backend...")
-    print(f"Frontend URL: {settings.frontend_url}")
-    print("=" * 50)
+    logger.info("Starting MediVoice Backend", extra={"frontend_url": settings.frontend_url})
+    await transcript_store.start()
+    if loop_monitor:
+        loop_monitor.start()
+    # Validate configuration and warm provider connections in the background;
+    # /health answers immediately, /ready once every check has passed
+    readiness_task = asyncio.create_task(readiness.run())
+    eviction_task = asyncio.create_task(tenant_registry.run_eviction())
     yield
-    print("Shutting down MediVoice Backend...")
+    logger.info("Shutting down MediVoice Backend")
+    readiness_task.cancel()
+    eviction_task.cancel()
+    await tenant_registry.close()
+    if loop_monitor:
+        await loop_monitor.stop()
+    await transcript_store.stop()
+    stop_logging()
 
 
 app = FastAPI(
@@ -46,10 +75,31 @@ app.add_middleware(
 )
 
 # Initialize services
-deepgram_service = DeepgramService()
-groq_service = GroqService()
-elevenlabs_service = ElevenLabsService()
-session_manager = SessionManager()
+# Tenant profiles are selected per WebSocket (/ws?tenant=<id>); the default
+# tenant's services are the ones warmed up at startup and used by admin jobs
+tenant_registry = TenantRegistry.load()
+deepgram_service = tenant_registry.default.deepgram
+groq_service = tenant_registry.default.groq
+elevenlabs_service = tenant_registry.default.elevenlabs
+semantic_cache = tenant_registry.default.semantic_cache
+transcript_store = TranscriptStore()
+session_manager = SessionManager(store=transcript_store)
+emergency_triage = EmergencyTriage()
+speculation_metrics = SpeculationMetrics()
+outbox_metrics = OutboxMetrics()
+
+loop_monitor = LoopMonitor(
+    slow_threshold=settings.loop_slow_callback_ms / 1000
+) if settings.loop_monitor_enabled else None
+
+readiness = ReadinessProbe(
+    timeout=settings.readiness_timeout,
+    max_retry_delay=settings.readiness_max_retry_delay,
+)
+readiness.add_check("deepgram", deepgram_service.warm_up)
+readiness.add_check("groq", groq_service.warm_up)
+# Also pre-renders greeting, goodbye and emergency audio
+readiness.add_check("elevenlabs", elevenlabs_service.warm_up)
 
 
 @app.get("/")
@@ -68,160 +118,292 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def ready_check():
+    """Readiness endpoint (configuration validated, providers warmed up)"""
+    return JSONResponse(readiness.status(), status_code=200 if readiness.ready else 503)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Guard for admin-only endpoints (closed unless ADMIN_TOKEN is set)"""
+    if not settings.admin_token or not x_admin_token or \
+            not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+if settings.admin_endpoints_enabled:
+    if not settings.admin_token:
+        raise RuntimeError("ADMIN_ENDPOINTS_ENABLED requires ADMIN_TOKEN to be set")
+
+    @app.get("/debug/loop", dependencies=[Depends(require_admin)])
+    async def debug_loop():
+        """Event-loop lag and recent slow callbacks"""
+        if not loop_monitor:
+            raise HTTPException(status_code=404, detail="Loop monitor disabled")
+        return loop_monitor.stats()
+
+    @app.get("/debug/profile", dependencies=[Depends(require_admin)])
+    async def debug_profile(
+        seconds: float = Query(5.0, gt=0, le=60),
+        hz: float = Query(100.0, gt=0, le=1000),
+        all_threads: bool = False
+    ):
+        """Sample the live worker and return folded stacks for flamegraph.pl / speedscope"""
+        thread_id = None if all_threads else threading.get_ident()
+        profile = await asyncio.to_thread(SamplingProfiler(thread_id).run, seconds, hz)
+        return PlainTextResponse(profile)
+
+    batch_summarizer: Optional[BatchSummarizer] = None
+    batch_task: Optional[asyncio.Task] = None
+
+    @app.post("/admin/summaries/batch", dependencies=[Depends(require_admin)])
+    async def start_batch_summaries(write_back: bool = True):
+        """Regenerate summaries for every stored session (resumes from BATCH_SUMMARY_OUTPUT)"""
+        global batch_summarizer, batch_task
+        if batch_task and not batch_task.done():
+            raise HTTPException(status_code=409, detail="Batch already running")
+        transcripts = [item async for item in iter_store_transcripts(transcript_store)]
+        batch_summarizer = BatchSummarizer(
+            groq_service, settings.batch_summary_output, store=transcript_store if write_back else None
+        )
+        batch_task = asyncio.create_task(batch_summarizer.run(transcripts), name="batch_summaries")
+        return {"status": "started", "sessions": len(transcripts), "output": settings.batch_summary_output}
+
+    @app.get("/admin/summaries/batch", dependencies=[Depends(require_admin)])
+    async def batch_summaries_status():
+        """Progress and throughput of the last batch run"""
+        if batch_summarizer is None:
+            raise HTTPException(status_code=404, detail="No batch run")
+        status = "running" if not batch_task.done() else "finished"
+        if batch_task.done() and not batch_task.cancelled() and batch_task.exception():
+            status = "error"
+        return {"status": status, **batch_summarizer.progress()}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Runtime metrics"""
+    return {
+        "semantic_cache": semantic_cache.stats() if semantic_cache else None,
+        "tenants": tenant_registry.stats(),
+        "speculation": speculation_metrics.stats(),
+        "outbox": outbox_metrics.stats(),
+    }
+
+
+@app.get("/sessions/{session_id}", dependencies=[Depends(require_admin)])
+async def get_session_record(session_id: str):
+    """Get a persisted session transcript and medical summary (patient data: admin only)"""
+    record = await transcript_store.get_session(session_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return record
+
+
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, tenant_id: Optional[str] = Query(None, alias="tenant")):
     """Main WebSocket endpoint for voice conversation"""
     await websocket.accept()
+    try:
+        tenant = tenant_registry.checkout(tenant_id)
+    except UnknownTenantError:
+        logger.warning("Rejected connection for unknown tenant", extra={"tenant": tenant_id})
+        await websocket.close(code=1008)
+        return
+    except TenantQuotaExceeded:
+        logger.warning("Rejected connection over tenant quota", extra={"tenant": tenant_id})
+        await websocket.close(code=1013)
+        return
+
     session_id = session_manager.create_session()
+    # Every log record (and task) created from here on carries the session id
+    bind_session(session_id)
+    # All outbound messages go through one writer task per connection
+    outbox = WebSocketOutbox(websocket, metrics=outbox_metrics)
+    outbox.start()
     deepgram_connection = None
+    speculator = None
 
-    logger.info(f"WebSocket connected: {session_id}")
+    logger.info("WebSocket connected", extra={"tenant": tenant.profile.tenant_id})
 
     try:
         # Variables to track state
         current_transcript = ""
         is_processing = False
-        processing_lock = asyncio.Lock()
 
-        logger.info(f"[{session_id}] Setting up callbacks...")
+        emergency_alerted = False
+        speculator = SpeculativeResponder(
+            generate=tenant.groq.get_response,
+            get_conversation=lambda: session_manager.get_conversation(session_id),
+            metrics=speculation_metrics
+        ) if settings.speculation_enabled else None
 
         # Callback for Deepgram transcripts
         def on_transcript(text: str, is_final: bool):
-            nonlocal current_transcript
-            logger.info(f"[{session_id}] Transcript: {text[:50]}... (final={is_final})")
-            asyncio.create_task(send_transcript(text, is_final))
+            nonlocal is_processing, emergency_alerted
+            transcript_logger.info("Transcript received", extra={"text": text[:50], "is_final": is_final})
+            # Local triage runs on interim and final results, ahead of the LLM turn
+            if not emergency_alerted:
+                triage = emergency_triage.check(text)
+                if triage:
+                    emergency_alerted = True
+                    asyncio.create_task(send_emergency(triage.phrase, triage.category), name="send_emergency")
+            # Start the LLM early once interim results stop changing
+            if speculator and not is_final and not is_processing:
+                speculator.on_interim(text)
+            # Superseded interim results are coalesced by the outbox
+            outbox.send_nowait({
+                "type": "transcript",
+                "text": text,
+                "is_final": is_final
+            })
 
-        async def send_transcript(text: str, is_final: bool):
-            nonlocal current_transcript, is_processing
-            try:
-                # Send transcript to frontend
-                await websocket.send_json({
-                    "type": "transcript",
-                    "text": text,
-                    "is_final": is_final
-                })
+            # Final transcript starts a turn unless one is already running
+            if is_final and text.strip():
+                if is_processing:
+                    transcript_logger.info("Skipping duplicate transcript", extra={"text": text[:30]})
+                else:
+                    is_processing = True
+                    asyncio.create_task(process_turn(text), name="process_turn")
 
-                # If final transcript and not already processing, generate response
-                # Use lock to prevent race condition with multiple final transcripts
-                async with processing_lock:
-                    if is_final and text.strip() and not is_processing:
-                        is_processing = True
-                    else:
-                        # Already processing or not final - skip
-                        if is_final and text.strip():
-                            logger.info(f"[{session_id}] Skipping duplicate transcript: {text[:30]}...")
-                        return
+        async def send_emergency(phrase: str, category: str):
+            logger.warning("Emergency triage hit", extra={"phrase": phrase, "category": category})
+            try:
+                await outbox.send({
+                    "type": "emergency",
+                    "text": EMERGENCY_MESSAGE,
+                    "matched": phrase,
+                    "category": category
+                }, lane=CONTROL)
+                # Pre-rendered during the readiness phase
+                emergency_audio = await asyncio.to_thread(tenant.elevenlabs.generate_emergency)
+                if emergency_audio:
+                    # Control lane: jumps ahead of any queued turn messages
+                    await outbox.send({
+                        "type": "audio",
+                        "data": base64.b64encode(emergency_audio).decode('utf-8'),
+                        "format": "mp3"
+                    }, lane=CONTROL)
+            except Exception as e:
+                logger.error("Error sending emergency alert: %s", e)
 
+        async def process_turn(text: str):
+            nonlocal current_transcript, is_processing
+            try:
                 current_transcript = text
 
                 # Add user message to session
                 session_manager.add_message(session_id, "user", text)
 
                 # Send thinking status
-                await websocket.send_json({
+                await outbox.send({
                     "type": "status",
                     "status": "thinking"
                 })
 
-                # Get AI response
+                # Get AI response (early turns may be served from the semantic cache)
                 conversation = session_manager.get_conversation(session_id)
-                response = groq_service.get_response(conversation)
+                cache = tenant.semantic_cache
+                cache_key = await cache.key(conversation) if cache else None
+                cached = cache.lookup(cache_key) if cache_key else None
+                if cached:
+                    logger.info("Semantic cache hit", extra={"key": cached.key_text[:30]})
+                    response = cached.response
+                    if speculator:
+                        speculator.cancel()
+                else:
+                    response = await speculator.resolve(conversation) if speculator else None
+                    if response is not None:
+                        logger.info("Speculative response committed")
+                    else:
+                        response = tenant.groq.get_response(conversation)
 
                 # Add assistant message to session
                 session_manager.add_message(session_id, "assistant", response)
 
                 # Send response text
-                await websocket.send_json({
+                await outbox.send({
                     "type": "response",
                     "text": response
                 })
 
                 # Send speaking status
-                await websocket.send_json({
+                await outbox.send({
                     "type": "status",
                     "status": "speaking"
                 })
 
                 # Generate and send TTS audio
-                audio_data = elevenlabs_service.generate_speech(response)
+                if cached:
+                    audio_data = cached.audio
+                else:
+                    audio_data = tenant.elevenlabs.generate_speech(response)
+                    if cache_key:
+                        cache.store(cache_key, response, audio_data)
                 if audio_data:
                     # Send audio as base64
                     audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-                    await websocket.send_json({
+                    await outbox.send({
                         "type": "audio",
                         "data": audio_base64,
                         "format": "mp3"
                     })
 
                 # Send listening status
-                await websocket.send_json({
+                await outbox.send({
                     "type": "status",
                     "status": "listening"
                 })
 
                 is_processing = False
 
-            except Exception as e:
-                logger.error(f"Error in send_transcript: {e}")
-                import traceback
-                logger.error(f"Traceback: {traceback.format_exc()}")
+            except Exception:
+                logger.exception("Error in process_turn")
                 is_processing = False
 
         # Create Deepgram connection
-        logger.info(f"[{session_id}] Creating Deepgram connection...")
         try:
-            deepgram_connection = await deepgram_service.create_live_connection(
+            deepgram_connection = await tenant.deepgram.create_live_connection(
                 on_transcript=on_transcript
             )
-            logger.info(f"[{session_id}] Deepgram connection created successfully")
-        except Exception as e:
-            logger.error(f"[{session_id}] Deepgram connection failed: {e}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("Deepgram connection failed")
             raise
 
         # Send initial greeting
-        logger.info(f"[{session_id}] Generating greeting...")
-        await websocket.send_json({
+        await outbox.send({
             "type": "status",
             "status": "speaking"
         })
 
-        greeting_audio = elevenlabs_service.generate_greeting()
-        logger.info(f"[{session_id}] Greeting audio generated: {len(greeting_audio) if greeting_audio else 0} bytes")
+        greeting_audio = await asyncio.to_thread(tenant.elevenlabs.generate_greeting)
+        logger.debug("Greeting audio ready", extra={"bytes": len(greeting_audio) if greeting_audio else 0})
         if greeting_audio:
             audio_base64 = base64.b64encode(greeting_audio).decode('utf-8')
-            await websocket.send_json({
+            await outbox.send({
                 "type": "audio",
                 "data": audio_base64,
                 "format": "mp3"
             })
-            logger.info(f"[{session_id}] Greeting audio sent")
 
         # Add greeting to conversation history
-        session_manager.add_message(
-            session_id,
-            "assistant",
-            "Hello! I'm your medical assistant. How can I help you today?"
-        )
+        session_manager.add_message(session_id, "assistant", GREETING_MESSAGE)
 
-        await websocket.send_json({
+        await outbox.send({
             "type": "status",
             "status": "listening"
         })
 
         # Main loop: receive messages from frontend
-        logger.info(f"[{session_id}] Entering main loop, waiting for messages...")
         while True:
             message = await websocket.receive()
 
             if "bytes" in message:
                 # Raw audio data from frontend
                 audio_data = message["bytes"]
-                logger.info(f"[{session_id}] Received binary audio: {len(audio_data)} bytes")
+                audio_logger.debug("Received binary audio", extra={"bytes": len(audio_data)})
                 if deepgram_connection and len(audio_data) > 0:
                     await deepgram_connection.send(audio_data)
-                    logger.info(f"[{session_id}] Sent to Deepgram")
 
             elif "text" in message:
                 data = json.loads(message["text"])
@@ -237,31 +419,32 @@ async def websocket_endpoint(websocket: WebSocket):
 
                 elif msg_type == "end_session":
                     # Generate medical summary
-                    await websocket.send_json({
+                    await outbox.send({
                         "type": "status",
                         "status": "thinking"
                     })
 
                     conversation = session_manager.get_conversation(session_id)
-                    summary = groq_service.generate_summary(conversation)
+                    summary = tenant.groq.generate_summary(conversation)
+                    transcript_store.save_summary(session_id, summary)
 
                     # Send goodbye audio
-                    goodbye_audio = elevenlabs_service.generate_goodbye()
+                    goodbye_audio = await asyncio.to_thread(tenant.elevenlabs.generate_goodbye)
                     if goodbye_audio:
                         audio_base64 = base64.b64encode(goodbye_audio).decode('utf-8')
-                        await websocket.send_json({
+                        await outbox.send({
                             "type": "audio",
                             "data": audio_base64,
                             "format": "mp3"
                         })
 
                     # Send summary
-                    await websocket.send_json({
+                    await outbox.send({
                         "type": "summary",
                         "data": summary
                     })
 
-                    await websocket.send_json({
+                    await outbox.send({
                         "type": "status",
                         "status": "idle"
                     })
@@ -273,13 +456,11 @@ async def websocket_endpoint(websocket: WebSocket):
                     pass
 
     except WebSocketDisconnect:
-        print(f"WebSocket disconnected: {session_id}")
+        logger.info("WebSocket disconnected")
     except Exception as e:
-        import traceback
-        print(f"WebSocket error: {e}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("WebSocket error")
         try:
-            await websocket.send_json({
+            await outbox.send({
                 "type": "error",
                 "message": str(e)
             })
@@ -287,10 +468,15 @@ async def websocket_endpoint(websocket: WebSocket):
             pass
     finally:
         # Cleanup
+        if speculator:
+            speculator.cancel()
+        # Deliver what is still queued (e.g. goodbye audio and summary)
+        await outbox.close()
         if deepgram_connection:
             await deepgram_connection.close()
         session_manager.end_session(session_id)
-        print(f"Session ended: {session_id}")
+        tenant_registry.release(tenant)
+        logger.info("Session ended")
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
-from .messages import WSMessage, TranscriptMessage, ResponseMessage, AudioMessage, SummaryMessage, ErrorMessage
+from .messages import WSMessage, TranscriptMessage, ResponseMessage, AudioMessage, SummaryMessage, ErrorMessage, EmergencyMessage
 from .medical import MedicalSummary
+from .tenant import TenantProfile
 
 __all__ = [
     "WSMessage",
@@ -8,5 +9,7 @@ __all__ = [
     "AudioMessage",
     "SummaryMessage",
     "ErrorMessage",
-    "MedicalSummary"
+    "EmergencyMessage",
+    "MedicalSummary",
+    "TenantProfile"
 ]
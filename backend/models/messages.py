@@ -32,6 +32,14 @@ class SummaryMessage(BaseModel):
     data: dict
 
 
+class EmergencyMessage(BaseModel):
+    """Local triage emergency alert (sent ahead of the LLM response)"""
+    type: Literal["emergency"] = "emergency"
+    text: str
+    matched: str
+    category: str
+
+
 class ErrorMessage(BaseModel):
     """Error message"""
     type: Literal["error"] = "error"
@@ -0,0 +1,23 @@
+from config import settings
+from pydantic import BaseModel
+
+
+class TenantProfile(BaseModel):
+    """Voice, language and model configuration of one tenant (clinic)"""
+    tenant_id: str
+    # Provider accounts (empty falls back to the global API keys)
+    deepgram_api_key: str = ""
+    groq_api_key: str = ""
+    elevenlabs_api_key: str = ""
+    # Speech-to-text
+    deepgram_model: str = settings.deepgram_model
+    deepgram_language: str = settings.deepgram_language
+    # LLM
+    groq_model: str = settings.groq_model
+    groq_max_tokens: int = settings.groq_max_tokens
+    groq_temperature: float = settings.groq_temperature
+    # Text-to-speech
+    elevenlabs_voice_id: str = settings.elevenlabs_voice_id
+    elevenlabs_model: str = settings.elevenlabs_model
+    # Concurrent WebSocket sessions (0 = unlimited)
+    max_sessions: int = settings.tenant_max_sessions
@@ -2,5 +2,28 @@ from .deepgram_service import DeepgramService
 from .groq_service import GroqService
 from .elevenlabs_service import ElevenLabsService
 from .session_manager import SessionManager
+from .transcript_store import TranscriptStore
+from .semantic_cache import SemanticResponseCache
+from .triage import EmergencyTriage
+from .speculation import SpeculativeResponder, SpeculationMetrics
+from .readiness import ReadinessProbe
+from .batch_summarizer import BatchSummarizer
+from .outbox import WebSocketOutbox, OutboxMetrics
+from .tenants import TenantRegistry
 
-__all__ = ["DeepgramService", "GroqService", "ElevenLabsService", "SessionManager"]
+__all__ = [
+    "DeepgramService",
+    "GroqService",
+    "ElevenLabsService",
+    "SessionManager",
+    "TranscriptStore",
+    "SemanticResponseCache",
+    "EmergencyTriage",
+    "SpeculativeResponder",
+    "SpeculationMetrics",
+    "ReadinessProbe",
+    "BatchSummarizer",
+    "WebSocketOutbox",
+    "OutboxMetrics",
+    "TenantRegistry"
+]
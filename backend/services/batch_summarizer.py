@@ -0,0 +1,234 @@
+from config import settings
+from models.medical import MedicalSummary
+from services.groq_service import SUMMARY_PROMPT, GroqService
+from services.transcript_store import TranscriptStore
+from utils.log import get_logger
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+import json
+import time
+
+logger = get_logger("batch")
+
+Transcript = Tuple[str, List[Dict]]
+
+
+class RateLimiter:
+    """Async token bucket limiting requests per minute"""
+
+    def __init__(self, per_minute: float, burst: float = 1.0):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a batch run"""
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+    failures: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def summaries_per_minute(self) -> float:
+        return self.succeeded / self.elapsed * 60 if self.elapsed else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed_s": round(self.elapsed, 2),
+            "summaries_per_minute": round(self.summaries_per_minute, 2),
+        }
+
+
+class BatchSummarizer:
+    """
+    Offline (re)generation of medical summaries for stored transcripts
+
+    Requests run in worker threads with bounded concurrency behind a
+    requests-per-minute limiter, and are retried with exponential backoff on
+    API errors, invalid JSON or summaries that fail MedicalSummary
+    validation. Each validated record is appended to a JSONL output file,
+    which doubles as the checkpoint: when the run is resumed, sessions are
+    skipped only if they already have a record from the same model and
+    summary prompt, so a prompt or model change regenerates everything. Sessions that still fail after all retries are
+    logged to "<output>.errors.jsonl" and picked up again on the next run.
+    """
+
+    def __init__(
+        self,
+        groq_service: GroqService,
+        output_path: str,
+        concurrency: int = settings.batch_summary_concurrency,
+        requests_per_minute: float = settings.groq_requests_per_minute,
+        max_retries: int = 3,
+        store: Optional[TranscriptStore] = None,
+    ):
+        self.groq_service = groq_service
+        self.output_path = Path(output_path)
+        self.errors_path = self.output_path.with_suffix(".errors.jsonl")
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(requests_per_minute, burst=concurrency)
+        self.max_retries = max_retries
+        self.store = store
+        self.prompt_hash = hashlib.sha256(SUMMARY_PROMPT.encode("utf-8")).hexdigest()[:12]
+        self.result = BatchResult()
+        self._start: Optional[float] = None
+        self._running = False
+
+    def progress(self) -> Dict:
+        """Counters and throughput so far (safe to call while running)"""
+        if self._running:
+            self.result.elapsed = time.perf_counter() - self._start
+        return self.result.to_dict()
+
+    def completed_sessions(self) -> Set[str]:
+        """Session ids already summarised in the output file by this model and prompt"""
+        done = set()
+        if not self.output_path.exists():
+            return done
+        with open(self.output_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    session_id = record["session_id"]
+                except (json.JSONDecodeError, KeyError):
+                    # Torn last line from an interrupted run
+                    continue
+                if record.get("model") == self.groq_service.model and \
+                        record.get("prompt_hash") == self.prompt_hash:
+                    done.add(session_id)
+        return done
+
+    async def run(self, transcripts: Iterable[Transcript]) -> BatchResult:
+        """Summarise every transcript not yet in the output file"""
+        self.result = BatchResult()
+        done = self.completed_sessions()
+        pending = []
+        for session_id, conversation in transcripts:
+            self.result.total += 1
+            if session_id in done or not conversation:
+                self.result.skipped += 1
+            else:
+                pending.append((session_id, conversation))
+
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._start = time.perf_counter()
+        self._running = True
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in pending:
+            queue.put_nowait(item)
+
+        try:
+            with open(self.output_path, "a", encoding="utf-8") as output, \
+                    open(self.errors_path, "a", encoding="utf-8") as errors:
+                workers = [
+                    asyncio.create_task(self._worker(queue, output, errors))
+                    for _ in range(min(self.concurrency, len(pending)))
+                ]
+                await asyncio.gather(*workers)
+        finally:
+            self._running = False
+            self.result.elapsed = time.perf_counter() - self._start
+        logger.info("Batch summarisation finished", extra=self.result.to_dict())
+        return self.result
+
+    async def _worker(self, queue: asyncio.Queue, output, errors):
+        while not queue.empty():
+            session_id, conversation = queue.get_nowait()
+            try:
+                summary = await self._summarize(conversation)
+            except Exception as e:
+                self.result.failed += 1
+                self.result.failures[session_id] = str(e)
+                logger.error("Summary failed for %s: %s", session_id, e)
+                errors.write(json.dumps({
+                    "session_id": session_id,
+                    "error": str(e),
+                    "failed_at": datetime.now().isoformat(),
+                }) + "\n")
+                errors.flush()
+                continue
+
+            record = {
+                "session_id": session_id,
+                "summary": summary.model_dump(),
+                "model": self.groq_service.model,
+                "prompt_hash": self.prompt_hash,
+                "generated_at": datetime.now().isoformat(),
+            }
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+            if self.store:
+                self.store.save_summary(session_id, record["summary"])
+            self.result.succeeded += 1
+            if self.result.succeeded % 50 == 0:
+                logger.info("Batch progress", extra=self.progress())
+
+    async def _summarize(self, conversation: List[Dict]) -> MedicalSummary:
+        delay = 1.0
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            try:
+                data = await asyncio.to_thread(self.groq_service.request_summary, conversation)
+                return MedicalSummary.model_validate(data)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning("Summary attempt %d failed, retrying: %s", attempt + 1, e)
+                await asyncio.sleep(delay)
+                delay *= 2
+
+
+def load_transcript_files(path: str) -> List[Transcript]:
+    """
+    Read transcripts from a JSON file, a JSONL file or a directory of JSON files
+
+    Each record needs a "session_id" and a "transcript" (or "messages") list
+    of {"role", "content"} entries.
+    """
+    source = Path(path)
+    files = sorted(source.glob("*.json*")) if source.is_dir() else [source]
+    transcripts = []
+    for file in files:
+        with open(file, "r", encoding="utf-8") as f:
+            if file.suffix == ".jsonl":
+                records = [json.loads(line) for line in f if line.strip()]
+            else:
+                data = json.load(f)
+                records = data if isinstance(data, list) else [data]
+        for record in records:
+            messages = record.get("transcript") or record.get("messages") or []
+            conversation = [{"role": m["role"], "content": m["content"]} for m in messages]
+            transcripts.append((record.get("session_id") or file.stem, conversation))
+    return transcripts
+
+
+async def iter_store_transcripts(store: TranscriptStore) -> AsyncIterator[Transcript]:
+    """Yield (session_id, conversation) for every session in the transcript store"""
+    for session_id in await store.list_sessions():
+        transcript = await store.get_transcript(session_id)
+        yield session_id, [{"role": m["role"], "content": m["content"]} for m in transcript]
@@ -1,16 +1,76 @@
-from deepgram import AsyncDeepgramClient
-from deepgram.core.events import EventType
-from deepgram.extensions.types.sockets import ListenV1ResultsEvent, ListenV1ControlMessage
 from config import settings
+from services.endpointing import AdaptiveEndpointer
+from utils.log import get_logger
+from functools import lru_cache
+from types import SimpleNamespace
 import asyncio
-from typing import Callable, Optional
+from typing import Callable, List, Optional
+
+logger = get_logger("deepgram")
+keepalive_logger = get_logger("deepgram.keepalive")
+
+# linear16, 16 kHz, mono
+BYTES_PER_SECOND = 32000
+# A single message with this much audio is a whole utterance endpointed by the client
+UTTERANCE_MIN_BYTES = BYTES_PER_SECOND // 2
+# Longest wait for Deepgram to flush a finalized utterance
+FINALIZE_TIMEOUT = 3.0
+
+@lru_cache()
+def _sdk() -> SimpleNamespace:
+    """Import the Deepgram SDK on first use (it is slow to import)"""
+    from deepgram import AsyncDeepgramClient
+    from deepgram.core.events import EventType
+    from deepgram.extensions.types.sockets import (
+        ListenV1ResultsEvent,
+        ListenV1ControlMessage,
+        ListenV1SpeechStartedEvent,
+        ListenV1UtteranceEndEvent,
+    )
+    return SimpleNamespace(
+        AsyncDeepgramClient=AsyncDeepgramClient,
+        EventType=EventType,
+        ListenV1ResultsEvent=ListenV1ResultsEvent,
+        ListenV1ControlMessage=ListenV1ControlMessage,
+        ListenV1SpeechStartedEvent=ListenV1SpeechStartedEvent,
+        ListenV1UtteranceEndEvent=ListenV1UtteranceEndEvent,
+    )
 
 
 class DeepgramService:
     """Service for Speech-to-Text using Deepgram API (SDK v5)"""
 
-    def __init__(self):
-        self.client = AsyncDeepgramClient(api_key=settings.deepgram_api_key)
+    def __init__(
+        self,
+        api_key: str = settings.deepgram_api_key,
+        model: str = settings.deepgram_model,
+        language: str = settings.deepgram_language,
+    ):
+        self._client = None
+        self.api_key = api_key
+        self.model = model
+        self.language = language
+
+    @property
+    def client(self):
+        """Deepgram client, created on first use"""
+        if self._client is None:
+            self._client = _sdk().AsyncDeepgramClient(api_key=self.api_key)
+        return self._client
+
+    async def warm_up(self):
+        """Validate the API key and open a connection to the Deepgram API"""
+        if not self.api_key:
+            raise RuntimeError("DEEPGRAM_API_KEY is not set")
+        # Import the SDK and build the client off the event loop
+        client = await asyncio.to_thread(lambda: self.client)
+        await client.manage.v1.projects.list()
+
+    async def close(self):
+        """Close the client's HTTP connections (if the client was created)"""
+        if self._client is not None:
+            await self._client._client_wrapper.httpx_client.httpx_client.aclose()
+            self._client = None
 
     async def create_live_connection(
         self,
@@ -21,13 +81,16 @@ class DeepgramService:
         Create a live transcription connection
 
         Args:
-            on_transcript: Callback(text, is_final) called when transcript received
+            on_transcript: Callback(text, is_final) called when transcript received;
+                is_final marks the end of the user's turn
             on_error: Optional callback for errors
         """
         connection_wrapper = DeepgramConnection(
             self.client,
             on_transcript=on_transcript,
-            on_error=on_error
+            on_error=on_error,
+            model=self.model,
+            language=self.language
         )
         await connection_wrapper.start()
         return connection_wrapper
@@ -38,11 +101,15 @@ class DeepgramConnection:
 
     def __init__(
         self,
-        client: AsyncDeepgramClient,
+        client,
         on_transcript: Callable[[str, bool], None],
-        on_error: Optional[Callable[[Exception], None]] = None
+        on_error: Optional[Callable[[Exception], None]] = None,
+        model: str = settings.deepgram_model,
+        language: str = settings.deepgram_language
     ):
         self.client = client
+        self.model = model
+        self.language = language
         self.on_transcript = on_transcript
         self.on_error = on_error
         self.connection = None
@@ -50,50 +117,53 @@ class DeepgramConnection:
         self._listen_task = None
         self._keepalive_task = None
         self._context_manager = None
+        # Turn assembly: finalized segments are held until the turn ends
+        self.endpointer = AdaptiveEndpointer()
+        self._segments: List[str] = []
+        self._turn_timer: Optional[asyncio.Task] = None
+        self._last_word_end: Optional[float] = None
+        self._finalize_pending = 0
 
     async def start(self):
         """Start the Deepgram streaming connection"""
         try:
-            print("[DeepgramConnection] Creating connection context manager...")
+            logger.debug("Creating connection context manager")
             # Create the connection context manager
             self._context_manager = self.client.listen.v1.connect(
-                model=settings.deepgram_model,
-                language=settings.deepgram_language,
+                model=self.model,
+                language=self.language,
                 encoding="linear16",
                 sample_rate="16000",
                 channels="1",
                 punctuate="true",
                 interim_results="true",
                 smart_format="true",
+                endpointing=str(settings.deepgram_endpointing_ms),
+                utterance_end_ms=str(settings.deepgram_utterance_end_ms),
+                vad_events="true" if settings.deepgram_vad_events else "false",
             )
-            print(f"[DeepgramConnection] Context manager created: {self._context_manager}")
 
             # Enter the context manager to get the connection
-            print("[DeepgramConnection] Entering context manager...")
             self.connection = await self._context_manager.__aenter__()
-            print(f"[DeepgramConnection] Connection established: {self.connection}")
+            logger.debug("Connection established")
             self.is_open = True
 
             # Set up event handlers
-            print("[DeepgramConnection] Setting up event handlers...")
-            self.connection.on(EventType.MESSAGE, self._handle_message)
-            self.connection.on(EventType.ERROR, self._handle_error)
-            self.connection.on(EventType.CLOSE, self._handle_close)
+            event_type = _sdk().EventType
+            self.connection.on(event_type.MESSAGE, self._handle_message)
+            self.connection.on(event_type.ERROR, self._handle_error)
+            self.connection.on(event_type.CLOSE, self._handle_close)
 
             # Start listening in a background task
-            print("[DeepgramConnection] Starting listen task...")
             self._listen_task = asyncio.create_task(self._listen())
 
             # Start keepalive task to prevent timeout during TTS playback
-            print("[DeepgramConnection] Starting keepalive task...")
             self._keepalive_task = asyncio.create_task(self._send_keepalive())
 
-            print("[DeepgramConnection] Connection started successfully")
+            logger.info("Connection started")
 
-        except Exception as e:
-            print(f"[DeepgramConnection] Error: {e}")
-            import traceback
-            print(f"[DeepgramConnection] Traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("Failed to start connection")
             raise
 
     async def _listen(self):
@@ -101,7 +171,7 @@ class DeepgramConnection:
         try:
             await self.connection.start_listening()
         except Exception as e:
-            print(f"Deepgram listening error: {e}")
+            logger.error("Listening error", exc_info=e)
             if self.on_error:
                 self.on_error(e)
 
@@ -113,51 +183,129 @@ class DeepgramConnection:
                 if self.is_open and self.connection:
                     try:
                         # Send KeepAlive control message using the SDK
-                        keepalive_msg = ListenV1ControlMessage(type="KeepAlive")
+                        keepalive_msg = _sdk().ListenV1ControlMessage(type="KeepAlive")
                         await self.connection.send_control(keepalive_msg)
-                        print("[DeepgramConnection] Keepalive sent")
+                        keepalive_logger.debug("Keepalive sent")
                     except Exception as e:
-                        print(f"[DeepgramConnection] Keepalive error: {e}")
+                        keepalive_logger.warning("Keepalive error: %s", e)
         except asyncio.CancelledError:
-            print("[DeepgramConnection] Keepalive task cancelled")
+            keepalive_logger.debug("Keepalive task cancelled")
         except Exception as e:
-            print(f"[DeepgramConnection] Keepalive task error: {e}")
+            keepalive_logger.error("Keepalive task error", exc_info=e)
 
     def _handle_message(self, message):
         """Handle incoming messages from Deepgram"""
         try:
-            if isinstance(message, ListenV1ResultsEvent):
+            sdk = _sdk()
+            if isinstance(message, sdk.ListenV1ResultsEvent):
                 if message.channel and message.channel.alternatives:
-                    transcript = message.channel.alternatives[0].transcript
-                    is_final = message.is_final or False
-                    if transcript:
-                        self.on_transcript(transcript, is_final)
+                    self._handle_results(message)
+            elif isinstance(message, sdk.ListenV1SpeechStartedEvent):
+                if self._turn_timer and not self._turn_timer.done():
+                    # Speaker resumed: hold the turn open until their words arrive
+                    if not self._finalize_pending:
+                        self._arm_turn_timer(self.endpointer.max_silence)
+                else:
+                    self.endpointer.observe_speech_start(message.timestamp)
+            elif isinstance(message, sdk.ListenV1UtteranceEndEvent):
+                # A pause inside an uploaded utterance is not the end of the turn
+                if not self._finalize_pending:
+                    self._end_turn()
         except Exception as e:
-            print(f"Transcript handling error: {e}")
+            logger.error("Transcript handling error", exc_info=e)
+
+    def _handle_results(self, message):
+        alternative = message.channel.alternatives[0]
+        transcript = alternative.transcript
+        if not message.is_final:
+            if transcript:
+                if not self._finalize_pending:
+                    self._cancel_turn_timer()
+                self.on_transcript(" ".join(self._segments + [transcript]), False)
+            return
+
+        words = alternative.words or []
+        self.endpointer.observe_words((w.start, w.end) for w in words)
+        if words:
+            self._last_word_end = words[-1].end
+        if transcript:
+            self._segments.append(transcript)
+            self.on_transcript(" ".join(self._segments), False)
+
+        if message.from_finalize:
+            # Deepgram has flushed everything sent before the Finalize
+            self._finalize_pending = max(0, self._finalize_pending - 1)
+            if not self._finalize_pending:
+                self._end_turn()
+        elif self._finalize_pending:
+            self._arm_turn_timer(FINALIZE_TIMEOUT)
+        elif self._segments:
+            # Silence already heard after the last word, in audio time
+            heard = 0.0
+            if self._last_word_end is not None:
+                heard = max(0.0, message.start + message.duration - self._last_word_end)
+            self._arm_turn_timer(max(0.0, self.endpointer.threshold - heard))
+
+    def _arm_turn_timer(self, delay: float):
+        self._cancel_turn_timer()
+        self._turn_timer = asyncio.create_task(self._end_turn_after(delay))
+
+    def _cancel_turn_timer(self):
+        if self._turn_timer:
+            self._turn_timer.cancel()
+            self._turn_timer = None
+
+    async def _end_turn_after(self, delay: float):
+        await asyncio.sleep(delay)
+        self._turn_timer = None
+        self._finalize_pending = 0
+        self._end_turn()
+
+    def _end_turn(self):
+        """Deliver the assembled user turn as a final transcript"""
+        self._cancel_turn_timer()
+        if not self._segments:
+            return
+        text = " ".join(self._segments)
+        self._segments = []
+        self.endpointer.end_turn()
+        self.on_transcript(text, True)
 
     def _handle_error(self, error):
         """Handle errors from Deepgram"""
-        print(f"Deepgram error: {error}")
+        logger.error("Deepgram error: %s", error)
         if self.on_error:
             self.on_error(error)
 
     def _handle_close(self, _):
         """Handle connection close"""
-        print("Deepgram connection closed")
+        logger.info("Connection closed by Deepgram")
         self.is_open = False
 
     async def send(self, audio_data: bytes):
-        """Send audio data to Deepgram"""
+        """
+        Send audio data to Deepgram
+
+        A message holding a whole utterance (the client VAD already waited for
+        the end of speech) is followed by a Finalize, and the turn ends as soon
+        as Deepgram returns the flushed result instead of after a silence timer.
+        """
         if self.is_open and self.connection and audio_data and len(audio_data) > 0:
             try:
                 await self.connection.send_media(audio_data)
+                if len(audio_data) >= UTTERANCE_MIN_BYTES:
+                    await self.connection.send_control(_sdk().ListenV1ControlMessage(type="Finalize"))
+                    self._finalize_pending += 1
+                    self._arm_turn_timer(FINALIZE_TIMEOUT)
             except Exception as e:
-                print(f"Error sending audio: {e}")
+                logger.warning("Error sending audio: %s", e)
 
     async def close(self):
         """Close the connection"""
         if self.is_open:
             try:
+                self._cancel_turn_timer()
+
                 # Cancel the keepalive task
                 if self._keepalive_task:
                     self._keepalive_task.cancel()
@@ -179,6 +327,6 @@ class DeepgramConnection:
                     await self._context_manager.__aexit__(None, None, None)
 
                 self.is_open = False
-                print("Deepgram connection closed")
+                logger.info("Connection closed", extra={"endpointing": self.endpointer.stats()})
             except Exception as e:
-                print(f"Error closing connection: {e}")
+                logger.warning("Error closing connection: %s", e)
@@ -1,16 +1,67 @@
-from elevenlabs import ElevenLabs
 from config import settings
-from typing import Generator, AsyncGenerator
+from utils.log import get_logger
+from typing import Dict, Generator, AsyncGenerator
 import asyncio
 
+logger = get_logger("elevenlabs")
+
+
+GREETING_MESSAGE = "Hello! I'm your medical assistant. How can I help you today?"
+GOODBYE_MESSAGE = "Thank you for sharing. Take care and feel better soon!"
+EMERGENCY_MESSAGE = (
+    "This sounds like it could be a medical emergency. "
+    "Please call 911 or your local emergency number right away."
+)
+
 
 class ElevenLabsService:
     """Service for Text-to-Speech using ElevenLabs API"""
 
-    def __init__(self):
-        self.client = ElevenLabs(api_key=settings.elevenlabs_api_key)
-        self.voice_id = settings.elevenlabs_voice_id
-        self.model_id = settings.elevenlabs_model
+    def __init__(
+        self,
+        api_key: str = settings.elevenlabs_api_key,
+        voice_id: str = settings.elevenlabs_voice_id,
+        model_id: str = settings.elevenlabs_model,
+    ):
+        self._client = None
+        self.api_key = api_key
+        self.voice_id = voice_id
+        self.model_id = model_id
+        # Pre-rendered audio for the fixed phrases (in this instance's voice)
+        self._phrase_audio: Dict[str, bytes] = {}
+
+    @property
+    def client(self):
+        """ElevenLabs client, created on first use (the SDK is slow to import)"""
+        if self._client is None:
+            from elevenlabs import ElevenLabs
+
+            self._client = ElevenLabs(api_key=self.api_key)
+        return self._client
+
+    def close(self):
+        """Close the client's HTTP connections (if the client was created)"""
+        if self._client is not None:
+            self._client._client_wrapper.httpx_client.httpx_client.close()
+            self._client = None
+
+    async def warm_up(self):
+        """Validate the API key and voice by pre-rendering the fixed phrases"""
+        if not self.api_key:
+            raise RuntimeError("ELEVENLABS_API_KEY is not set")
+        phrases = [GREETING_MESSAGE, GOODBYE_MESSAGE, EMERGENCY_MESSAGE]
+        results = await asyncio.gather(*(asyncio.to_thread(self._phrase, p) for p in phrases))
+        if not all(results):
+            raise RuntimeError("Could not synthesize speech (check API key and voice id)")
+
+    def _phrase(self, text: str) -> bytes:
+        """Generate a fixed phrase once and reuse the audio"""
+        audio = self._phrase_audio.get(text)
+        if not audio:
+            audio = self.generate_speech(text)
+            if audio:
+                self._phrase_audio[text] = audio
+        return audio
 
     def generate_speech(self, text: str) -> bytes:
         """Generate speech audio from text (non-streaming)"""
@@ -28,7 +79,7 @@ class ElevenLabsService:
                     audio_bytes += chunk
             return audio_bytes
         except Exception as e:
-            print(f"ElevenLabs error: {e}")
+            logger.error("Speech generation failed: %s", e)
             return b""
 
     def stream_speech(self, text: str) -> Generator[bytes, None, None]:
@@ -45,7 +96,7 @@ class ElevenLabsService:
                 if chunk:
                     yield chunk
         except Exception as e:
-            print(f"ElevenLabs streaming error: {e}")
+            logger.error("Speech streaming failed: %s", e)
 
     async def stream_speech_async(self, text: str) -> AsyncGenerator[bytes, None]:
         """Async generator for streaming speech"""
@@ -62,14 +113,16 @@ class ElevenLabsService:
                     yield chunk
                     await asyncio.sleep(0)  # Yield control to event loop
         except Exception as e:
-            print(f"ElevenLabs async streaming error: {e}")
+            logger.error("Async speech streaming failed: %s", e)
 
     def generate_greeting(self) -> bytes:
         """Generate the initial greeting audio"""
-        greeting = "Hello! I'm your medical assistant. How can I help you today?"
-        return self.generate_speech(greeting)
+        return self._phrase(GREETING_MESSAGE)
+
+    def generate_emergency(self) -> bytes:
+        """Generate the emergency referral audio"""
+        return self._phrase(EMERGENCY_MESSAGE)
 
     def generate_goodbye(self) -> bytes:
         """Generate the goodbye audio"""
-        goodbye = "Thank you for sharing. Take care and feel better soon!"
-        return self.generate_speech(goodbye)
+        return self._phrase(GOODBYE_MESSAGE)
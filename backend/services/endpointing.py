@@ -0,0 +1,82 @@
+from config import settings
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class AdaptiveEndpointer:
+    """
+    Per-session silence threshold for ending a user turn
+
+    Learns the speaker's pause lengths from Deepgram word timings (gaps
+    between consecutive words) and from cut-offs (speech resuming shortly
+    after a turn was closed). The threshold is a high percentile of the
+    observed pauses plus a margin, clamped to [min_silence, max_silence].
+    """
+
+    # Gaps shorter than this are ordinary word spacing, not pauses
+    MIN_PAUSE = 0.12
+    MIN_SAMPLES = 5
+
+    def __init__(
+        self,
+        adaptive: bool = settings.endpointing_adaptive,
+        initial_silence: float = settings.endpointing_initial_silence_ms / 1000,
+        min_silence: float = settings.endpointing_min_silence_ms / 1000,
+        max_silence: float = settings.endpointing_max_silence_ms / 1000,
+        percentile: float = settings.endpointing_pause_percentile,
+        margin: float = settings.endpointing_margin_ms / 1000,
+        window: int = 50,
+    ):
+        self.adaptive = adaptive
+        self.initial_silence = initial_silence
+        self.min_silence = min_silence
+        self.max_silence = max_silence
+        self.percentile = percentile
+        self.margin = margin
+        self.pauses = deque(maxlen=window)
+        self._last_word_end: Optional[float] = None
+        self._turn_end: Optional[float] = None
+        self.turns = 0
+        self.cutoffs = 0
+
+    @property
+    def threshold(self) -> float:
+        """Current silence (seconds) required to end a turn"""
+        if not self.adaptive or len(self.pauses) < self.MIN_SAMPLES:
+            return self.initial_silence
+        ordered = sorted(self.pauses)
+        index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+        return max(self.min_silence, min(self.max_silence, ordered[index] + self.margin))
+
+    def observe_words(self, words: Iterable[Tuple[float, float]]):
+        """Record pauses between consecutive (start, end) word timings"""
+        for start, end in words:
+            if self._last_word_end is not None:
+                gap = start - self._last_word_end
+                if gap >= self.MIN_PAUSE:
+                    self.pauses.append(gap)
+            self._last_word_end = max(end, self._last_word_end or 0.0)
+
+    def end_turn(self):
+        """Mark the end of a user turn (the next gap is not a pause)"""
+        self.turns += 1
+        self._turn_end = self._last_word_end
+        self._last_word_end = None
+
+    def observe_speech_start(self, timestamp: float):
+        """Record a cut-off if speech resumes soon after a turn was closed"""
+        if self._turn_end is None or self._last_word_end is not None:
+            return
+        gap = timestamp - self._turn_end
+        if 0 <= gap < self.max_silence:
+            self.cutoffs += 1
+            self.pauses.append(gap)
+        self._turn_end = None
+
+    def stats(self) -> Dict:
+        return {
+            "threshold_ms": round(self.threshold * 1000),
+            "pause_samples": len(self.pauses),
+            "turns": self.turns,
+            "cutoffs": self.cutoffs,
+        }
@@ -1,16 +1,85 @@
-from groq import Groq
 from config import settings
+from utils.log import get_logger
 from typing import List, Dict
+import asyncio
 import json
 
+logger = get_logger("groq")
+
+
+# Emergency topics from the system prompt's IMPORTANT RULES; any conversation
+# mentioning one must always reach the LLM
+EMERGENCY_KEYWORDS = [
+    "chest pain",
+    "breathing trouble",
+    "trouble breathing",
+    "can't breathe",
+    "cannot breathe",
+    "short of breath",
+    "bleeding",
+    "stroke",
+    "slurred speech",
+    "face drooping",
+    "911",
+]
+
+# Reply used when the chat completion fails; never cached
+FALLBACK_RESPONSE = "I apologize, I'm having trouble processing that. Could you please repeat what you said?"
+
+# Medical summary instructions (batch summaries record a hash of this prompt)
+SUMMARY_PROMPT = """Based on this patient conversation, generate a structured medical summary.
+
+Return ONLY valid JSON in this exact format (no markdown, no extra text):
+{
+    "chief_complaint": "Brief 1-line description of main issue",
+    "history_of_present_illness": "Detailed narrative paragraph of symptoms, timeline, and characteristics",
+    "relevant_history": ["Point 1", "Point 2"],
+    "assessment": "Clinical impression of likely condition",
+    "recommendations": ["Recommendation 1", "Recommendation 2"]
+}
+
+Only include information that was actually mentioned in the conversation. Be concise but thorough."""
+
 
 class GroqService:
     """Service for LLM interactions using Groq API"""
 
-    def __init__(self):
-        self.client = Groq(api_key=settings.groq_api_key)
+    def __init__(
+        self,
+        api_key: str = settings.groq_api_key,
+        model: str = settings.groq_model,
+        max_tokens: int = settings.groq_max_tokens,
+        temperature: float = settings.groq_temperature,
+    ):
+        self._client = None
+        self.api_key = api_key
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
         self.system_prompt = self._get_system_prompt()
 
+    @property
+    def client(self):
+        """Groq client, created on first use (the SDK is slow to import)"""
+        if self._client is None:
+            from groq import Groq
+
+            self._client = Groq(api_key=self.api_key)
+        return self._client
+
+    async def warm_up(self):
+        """Validate the API key and open a connection to the Groq API"""
+        if not self.api_key:
+            raise RuntimeError("GROQ_API_KEY is not set")
+        # The client is built inside the thread too (import and TLS setup block)
+        await asyncio.to_thread(lambda: self.client.models.list())
+
+    def close(self):
+        """Close the client's HTTP connections (if the client was created)"""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
     def _get_system_prompt(self) -> str:
         return """You are a warm, friendly medical assistant having a natural conversation with a patient. You're like a caring friend who happens to know about health.
 
@@ -54,49 +123,20 @@ Remember: You're having a friendly chat, not conducting a formal interview!"""
 
         try:
             response = self.client.chat.completions.create(
-                model=settings.groq_model,
+                model=self.model,
                 messages=messages,
-                max_tokens=settings.groq_max_tokens,
-                temperature=settings.groq_temperature,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
             )
             return response.choices[0].message.content
         except Exception as e:
-            print(f"Groq API error: {e}")
-            return "I apologize, I'm having trouble processing that. Could you please repeat what you said?"
+            logger.error("Chat completion failed: %s", e)
+            return FALLBACK_RESPONSE
 
     def generate_summary(self, conversation: List[Dict]) -> Dict:
         """Generate medical summary from conversation"""
-        summary_prompt = """Based on this patient conversation, generate a structured medical summary.
-
-Return ONLY valid JSON in this exact format (no markdown, no extra text):
-{
-    "chief_complaint": "Brief 1-line description of main issue",
-    "history_of_present_illness": "Detailed narrative paragraph of symptoms, timeline, and characteristics",
-    "relevant_history": ["Point 1", "Point 2"],
-    "assessment": "Clinical impression of likely condition",
-    "recommendations": ["Recommendation 1", "Recommendation 2"]
-}
-
-Only include information that was actually mentioned in the conversation. Be concise but thorough."""
-
-        formatted_convo = self._format_conversation(conversation)
-
-        messages = [
-            {"role": "system", "content": summary_prompt},
-            {"role": "user", "content": f"Patient Conversation:\n\n{formatted_convo}"}
-        ]
-
         try:
-            response = self.client.chat.completions.create(
-                model=settings.groq_model,
-                messages=messages,
-                max_tokens=1000,
-                temperature=0.3,
-            )
-
-            content = response.choices[0].message.content
-            # Try to parse JSON
-            return json.loads(content)
+            return self.request_summary(conversation)
         except json.JSONDecodeError:
             # If JSON parsing fails, return structured error
             return {
@@ -107,7 +147,7 @@ Only include information that was actually mentioned in the conversation. Be con
                 "recommendations": ["Review conversation transcript manually"]
             }
         except Exception as e:
-            print(f"Groq summary error: {e}")
+            logger.error("Summary generation failed: %s", e)
             return {
                 "chief_complaint": "Error generating summary",
                 "history_of_present_illness": str(e),
@@ -116,6 +156,25 @@ Only include information that was actually mentioned in the conversation. Be con
                 "recommendations": []
             }
 
+    def request_summary(self, conversation: List[Dict]) -> Dict:
+        """Request a medical summary; raises on API errors and invalid JSON"""
+        formatted_convo = self._format_conversation(conversation)
+
+        messages = [
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": f"Patient Conversation:\n\n{formatted_convo}"}
+        ]
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=1000,
+            temperature=0.3,
+        )
+
+        content = response.choices[0].message.content
+        return json.loads(content)
+
     def _format_conversation(self, conversation: List[Dict]) -> str:
         """Format conversation for summary generation"""
         lines = []
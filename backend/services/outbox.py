@@ -0,0 +1,188 @@
+from config import settings
+from utils.log import get_logger
+from collections import deque
+from fastapi import WebSocket
+from typing import Deque, Dict, List, Optional, Tuple
+import asyncio
+import time
+
+logger = get_logger("outbox")
+
+# Lanes in priority order
+CONTROL, TURN, TRANSCRIPT = 0, 1, 2
+LANE_NAMES = ("control", "turn", "transcript")
+
+
+def lane_for(message: Dict) -> int:
+    """
+    Default lane of a server message
+
+    Status, response, summary, final transcript and audio messages share the
+    FIFO turn lane, so e.g. "listening" never overtakes the audio it follows.
+    Interim transcripts use the (coalescing) transcript lane; the control lane
+    is only used when asked for explicitly (emergency alerts).
+    """
+    if message.get("type") == "transcript" and not message.get("is_final"):
+        return TRANSCRIPT
+    return TURN
+
+
+class OutboxMetrics:
+    """Process-wide outbox counters"""
+
+    def __init__(self):
+        self.sent = 0
+        self.coalesced = 0
+        self.backpressure_waits = 0
+        self.send_timeouts = 0
+        self.max_send_time = 0.0
+
+    def stats(self) -> Dict:
+        return {
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "backpressure_waits": self.backpressure_waits,
+            "send_timeouts": self.send_timeouts,
+            "max_send_ms": round(self.max_send_time * 1000, 1),
+        }
+
+
+class WebSocketOutbox:
+    """
+    Single-writer outbound queue for one WebSocket
+
+    Messages are queued in three lanes (urgent control, turn messages in
+    order, interim transcripts) and written by one task, always taking the
+    highest-priority lane first; each lane is FIFO. A new interim transcript
+    replaces the one still waiting, and a final transcript drops all waiting
+    interims, so a slow client only ever receives the latest partial text.
+    Turn audio is bounded: `send` waits for room once `audio_queue_size`
+    payloads are queued. A send that takes longer than `send_timeout` closes
+    the socket.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        metrics: Optional[OutboxMetrics] = None,
+        audio_queue_size: int = settings.outbox_audio_queue_size,
+        send_timeout: float = settings.outbox_send_timeout,
+    ):
+        self.websocket = websocket
+        self.metrics = metrics or OutboxMetrics()
+        self.send_timeout = send_timeout
+        self.closed = False
+        self._lanes: List[Deque[Tuple[Dict, bool]]] = [deque() for _ in LANE_NAMES]
+        self._audio_slots = asyncio.Semaphore(audio_queue_size)
+        self._audio_queue_size = audio_queue_size
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run(), name="outbox_writer")
+
+    async def send(self, message: Dict, lane: Optional[int] = None):
+        """Queue a message, waiting for room if too much turn audio is queued"""
+        lane = lane_for(message) if lane is None else lane
+        if lane != TURN or message.get("type") != "audio":
+            self.send_nowait(message, lane)
+            return
+        if self._audio_slots.locked():
+            self.metrics.backpressure_waits += 1
+        await self._audio_slots.acquire()
+        if self.closed:
+            return
+        self._enqueue(message, lane, holds_slot=True)
+
+    def send_nowait(self, message: Dict, lane: Optional[int] = None):
+        """Queue a message without waiting (used from synchronous callbacks)"""
+        if self.closed:
+            return
+        self._enqueue(message, lane_for(message) if lane is None else lane, holds_slot=False)
+
+    def _enqueue(self, message: Dict, lane: int, holds_slot: bool):
+        if message.get("type") == "transcript":
+            interims = self._lanes[TRANSCRIPT]
+            if message.get("is_final"):
+                self.metrics.coalesced += len(interims)
+                interims.clear()
+            elif interims:
+                interims.pop()
+                self.metrics.coalesced += 1
+        self._lanes[lane].append((message, holds_slot))
+        self._idle.clear()
+        self._wakeup.set()
+
+    def _next(self) -> Optional[Tuple[Dict, bool]]:
+        for queue in self._lanes:
+            if queue:
+                return queue.popleft()
+        return None
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            while (item := self._next()) is not None:
+                message, holds_slot = item
+                start = time.monotonic()
+                try:
+                    await asyncio.wait_for(self.websocket.send_json(message), self.send_timeout)
+                except asyncio.TimeoutError:
+                    self.metrics.send_timeouts += 1
+                    await self._fail(f"send of {message.get('type')} exceeded {self.send_timeout:g} s")
+                    return
+                except Exception as e:
+                    await self._fail(str(e) or type(e).__name__)
+                    return
+                finally:
+                    if holds_slot:
+                        self._audio_slots.release()
+                elapsed = time.monotonic() - start
+                self.metrics.sent += 1
+                self.metrics.max_send_time = max(self.metrics.max_send_time, elapsed)
+            self._wakeup.clear()
+            self._idle.set()
+
+    async def _fail(self, reason: str):
+        """Stop writing, drop what is queued and close the socket"""
+        logger.warning("Outbox closed: %s", reason, extra={"queued": self.depth()})
+        self.closed = True
+        for queue in self._lanes:
+            for _, holds_slot in queue:
+                if holds_slot:
+                    self._audio_slots.release()
+            queue.clear()
+        # Wake producers waiting for audio room; they see `closed` and return
+        for _ in range(self._audio_queue_size):
+            self._audio_slots.release()
+        self._idle.set()
+        try:
+            await self.websocket.close(code=1011)
+        except Exception:
+            pass
+
+    def depth(self) -> Dict[str, int]:
+        return {name: len(queue) for name, queue in zip(LANE_NAMES, self._lanes)}
+
+    async def flush(self, timeout: Optional[float] = None):
+        """Wait until everything queued so far has been written"""
+        await asyncio.wait_for(self._idle.wait(), timeout)
+
+    async def close(self, drain_timeout: float = 5.0):
+        """Write what is still queued (up to `drain_timeout`) and stop the writer"""
+        if self._task is None:
+            return
+        if not self.closed:
+            try:
+                await self.flush(drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Outbox not drained on close", extra={"queued": self.depth()})
+        self.closed = True
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -0,0 +1,71 @@
+from typing import Awaitable, Callable, Dict
+from utils.log import get_logger
+import asyncio
+import logging
+import time
+
+logger = get_logger("readiness")
+
+
+class ReadinessProbe:
+    """
+    Startup readiness phase
+
+    Runs named checks (configuration validation, provider connection and
+    cache warm-up) concurrently. The service is ready once every check has
+    passed; results are kept for the /ready endpoint. Failed checks are
+    re-run with exponential backoff (`retry_delay` up to `max_retry_delay`),
+    so a provider blip during boot does not keep the instance unready.
+    """
+
+    def __init__(self, timeout: float = 15.0, retry_delay: float = 1.0, max_retry_delay: float = 60.0):
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.checks: Dict[str, Callable[[], Awaitable]] = {}
+        self.results: Dict[str, Dict] = {}
+        self.ready = False
+        self.completed = False
+
+    def add_check(self, name: str, check: Callable[[], Awaitable]):
+        """Register an async check; it passes if it returns without raising"""
+        self.checks[name] = check
+        self.results[name] = {"status": "pending"}
+
+    async def run(self) -> bool:
+        """Run all checks in parallel, then re-run failed ones until every check passes"""
+        pending = dict(self.checks)
+        delay = self.retry_delay
+        while True:
+            await asyncio.gather(*(self._run_check(name, check) for name, check in pending.items()))
+            self.ready = all(r["status"] == "ok" for r in self.results.values())
+            logger.log(
+                logging.INFO if self.ready else (logging.WARNING if self.completed else logging.ERROR),
+                "Ready" if self.ready else f"Not ready, retrying in {delay:g}s",
+                extra={"checks": self.results}
+            )
+            self.completed = True
+            if self.ready:
+                return True
+            pending = {name: check for name, check in self.checks.items()
+                       if self.results[name]["status"] != "ok"}
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+    async def _run_check(self, name: str, check: Callable[[], Awaitable]):
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), timeout=self.timeout)
+            result = {"status": "ok"}
+        except asyncio.TimeoutError:
+            result = {"status": "failed", "error": f"timed out after {self.timeout}s"}
+        except Exception as e:
+            result = {"status": "failed", "error": str(e)}
+        result["duration_ms"] = round((time.perf_counter() - start) * 1000)
+        self.results[name] = result
+
+    def status(self) -> Dict:
+        return {
+            "status": "ready" if self.ready else ("not_ready" if self.completed else "starting"),
+            "checks": self.results,
+        }
@@ -0,0 +1,198 @@
+from config import settings
+from services.groq_service import EMERGENCY_KEYWORDS, FALLBACK_RESPONSE
+from services.triage import EmergencyTriage
+from utils.log import get_logger
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import asyncio
+import hashlib
+import math
+import re
+import time
+
+logger = get_logger("cache")
+
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+class HashingEmbedder:
+    """
+    Zero-dependency CPU embedder
+
+    Projects word unigrams and character trigrams into a fixed number of
+    hashed buckets and L2-normalises the result. Matches near-identical
+    phrasings ("I have a headache." / "I have a bad headache"); set
+    `semantic_cache_embedding_model` for true paraphrase matching.
+    """
+
+    def __init__(self, dimensions: int = 1024):
+        self.dimensions = dimensions
+
+    def _bucket(self, token: str) -> int:
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") % self.dimensions
+
+    def embed(self, text: str) -> Dict[int, float]:
+        vector: Dict[int, float] = {}
+        words = _WORD_RE.findall(text.lower())
+        for word in words:
+            bucket = self._bucket("w:" + word)
+            vector[bucket] = vector.get(bucket, 0.0) + 1.0
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                bucket = self._bucket("c:" + padded[i:i + 3])
+                vector[bucket] = vector.get(bucket, 0.0) + 0.5
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        if norm:
+            for key in vector:
+                vector[key] /= norm
+        return vector
+
+
+class FastEmbedEmbedder:
+    """Small ONNX sentence-embedding model via the optional `fastembed` package"""
+
+    def __init__(self, model_name: str):
+        from fastembed import TextEmbedding
+
+        self.model = TextEmbedding(model_name=model_name)
+
+    def embed(self, text: str) -> Dict[int, float]:
+        dense = next(iter(self.model.embed([text])))
+        return {i: float(v) for i, v in enumerate(dense) if v}
+
+
+def _cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+@dataclass
+class CacheKey:
+    """Embedded conversation state, computed once per turn"""
+    text: str
+    embedding: Dict[int, float]
+
+
+@dataclass
+class CacheEntry:
+    """A cached assistant turn (text plus synthesized audio)"""
+    key_text: str
+    embedding: Dict[int, float]
+    response: str
+    audio: bytes
+    expires_at: float
+    hits: int = field(default=0)
+
+
+class SemanticResponseCache:
+    """
+    Opt-in cache of assistant replies for early, near-identical patient turns
+
+    The conversation state (the patient's utterances so far) is embedded and
+    compared against cached entries by cosine similarity. A hit above the
+    threshold reuses both the reply text and its TTS audio. The cache never
+    applies to conversations that mention an emergency keyword or that
+    emergency triage flags, and never stores the fallback reply of a failed
+    completion.
+
+    Embedding runs in a worker thread (`key`); the resulting key is then
+    used for both `lookup` and, on a miss, `store`.
+    """
+
+    def __init__(
+        self,
+        threshold: float = settings.semantic_cache_threshold,
+        ttl: float = settings.semantic_cache_ttl,
+        max_entries: int = settings.semantic_cache_max_entries,
+        max_user_turns: int = settings.semantic_cache_max_user_turns,
+        embedding_model: str = settings.semantic_cache_embedding_model,
+        embedder=None,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_user_turns = max_user_turns
+        # An embedder can be shared between caches (e.g. one cache per tenant)
+        self.embedder = embedder or self._load_embedder(embedding_model)
+        self.triage = EmergencyTriage()
+        self.entries: List[CacheEntry] = []
+        self.hits = 0
+        self.misses = 0
+
+    def _load_embedder(self, model_name: str):
+        if model_name:
+            try:
+                return FastEmbedEmbedder(model_name)
+            except Exception as e:
+                logger.warning("Could not load '%s', using hashing embedder: %s", model_name, e)
+        return HashingEmbedder()
+
+    def _key_text(self, conversation: List[Dict]) -> Optional[str]:
+        """Conversation state used as the cache key, or None if not cacheable"""
+        user_turns = [m["content"] for m in conversation if m["role"] == "user"]
+        if not user_turns or len(user_turns) > self.max_user_turns:
+            return None
+        lowered = " ".join(m["content"] for m in conversation).lower()
+        if any(keyword in lowered for keyword in EMERGENCY_KEYWORDS):
+            return None
+        if any(self.triage.check(turn) for turn in user_turns):
+            return None
+        return " | ".join(turn.strip().lower() for turn in user_turns)
+
+    def _evict_expired(self, now: float):
+        self.entries = [e for e in self.entries if e.expires_at > now]
+
+    async def key(self, conversation: List[Dict]) -> Optional[CacheKey]:
+        """Embed the conversation state off the event loop (None if not cacheable)"""
+        key_text = self._key_text(conversation)
+        if key_text is None:
+            return None
+        embedding = await asyncio.to_thread(self.embedder.embed, key_text)
+        return CacheKey(text=key_text, embedding=embedding)
+
+    def lookup(self, key: CacheKey) -> Optional[CacheEntry]:
+        """Return the best cached turn for this key, if similar enough"""
+        self._evict_expired(time.monotonic())
+
+        best, best_score = None, 0.0
+        for entry in self.entries:
+            score = _cosine(key.embedding, entry.embedding)
+            if score > best_score:
+                best, best_score = entry, score
+
+        if best and best_score >= self.threshold:
+            best.hits += 1
+            self.hits += 1
+            return best
+        self.misses += 1
+        return None
+
+    def store(self, key: CacheKey, response: str, audio: bytes):
+        """Cache a freshly generated turn under the key it was looked up with"""
+        if not response or not audio or response == FALLBACK_RESPONSE:
+            return
+        now = time.monotonic()
+        self._evict_expired(now)
+        if len(self.entries) >= self.max_entries:
+            # Drop the entry closest to expiry
+            self.entries.remove(min(self.entries, key=lambda e: e.expires_at))
+        self.entries.append(CacheEntry(
+            key_text=key.text,
+            embedding=key.embedding,
+            response=response,
+            audio=audio,
+            expires_at=now + self.ttl,
+        ))
+
+    def stats(self) -> Dict:
+        """Hit-rate metrics"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
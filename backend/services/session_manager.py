@@ -2,6 +2,11 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import uuid
 
+from services.transcript_store import TranscriptStore
+from utils.log import get_logger
+
+logger = get_logger("session")
+
 
 class Session:
     """Represents a single conversation session"""
@@ -12,13 +17,15 @@ class Session:
         self.started_at = datetime.now()
         self.ended_at: Optional[datetime] = None
 
-    def add_message(self, role: str, content: str):
+    def add_message(self, role: str, content: str) -> Dict:
         """Add a message to the conversation history"""
-        self.messages.append({
+        message = {
             "role": role,
             "content": content,
             "timestamp": datetime.now().isoformat()
-        })
+        }
+        self.messages.append(message)
+        return message
 
     def get_messages(self) -> List[Dict]:
         """Get messages formatted for LLM (role and content only)"""
@@ -36,14 +43,18 @@ class Session:
 class SessionManager:
     """Manages all active conversation sessions"""
 
-    def __init__(self):
+    def __init__(self, store: Optional[TranscriptStore] = None):
         self.sessions: Dict[str, Session] = {}
+        self.store = store
 
     def create_session(self) -> str:
         """Create a new session and return its ID"""
         session_id = str(uuid.uuid4())
-        self.sessions[session_id] = Session(session_id)
-        print(f"Created session: {session_id}")
+        session = Session(session_id)
+        self.sessions[session_id] = session
+        if self.store:
+            self.store.record_session(session_id, started_at=session.started_at.isoformat())
+        logger.info("Created session %s", session_id)
         return session_id
 
     def get_session(self, session_id: str) -> Optional[Session]:
@@ -53,7 +64,12 @@ class SessionManager:
     def add_message(self, session_id: str, role: str, content: str):
         """Add a message to a session"""
         if session_id in self.sessions:
-            self.sessions[session_id].add_message(role, content)
+            session = self.sessions[session_id]
+            message = session.add_message(role, content)
+            if self.store:
+                self.store.append_message(
+                    session_id, len(session.messages) - 1, role, content, message["timestamp"]
+                )
 
     def get_conversation(self, session_id: str) -> List[Dict]:
         """Get conversation history for LLM"""
@@ -66,8 +82,10 @@ class SessionManager:
         if session_id in self.sessions:
             session = self.sessions[session_id]
             session.end()
+            if self.store:
+                self.store.record_session(session_id, ended_at=session.ended_at.isoformat())
             history = session.get_full_history()
             del self.sessions[session_id]
-            print(f"Ended session: {session_id}")
+            logger.info("Ended session %s", session_id)
             return history
         return None
@@ -0,0 +1,141 @@
+from config import settings
+from utils.log import get_logger
+from typing import Callable, Dict, List, Optional
+import asyncio
+import re
+import time
+
+logger = get_logger("speculation")
+
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9' ]+")
+
+
+def normalize_transcript(text: str) -> str:
+    """Normalise a transcript so smart_format/punctuation changes still match"""
+    return " ".join(_NON_WORD_RE.sub(" ", text.lower()).split())
+
+
+class SpeculationMetrics:
+    """Process-wide speculation counters"""
+
+    def __init__(self):
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved_total = 0.0
+
+    def stats(self) -> Dict:
+        resolved = self.hits + self.misses
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / resolved if resolved else 0.0,
+            "latency_saved_total_s": round(self.latency_saved_total, 3),
+            "latency_saved_avg_s": round(self.latency_saved_total / self.hits, 3) if self.hits else 0.0,
+        }
+
+
+class SpeculativeResponder:
+    """
+    Starts the LLM turn early once interim transcripts stop changing
+
+    Each interim result re-arms a timer. When no new interim arrives within
+    the stable window, the response is generated in a worker thread against
+    the conversation plus the interim text. The final transcript either
+    commits that result (same normalised text and history) or discards it.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[List[Dict]], str],
+        get_conversation: Callable[[], List[Dict]],
+        metrics: SpeculationMetrics,
+        stable_window: float = settings.speculation_stable_window,
+    ):
+        self.generate = generate
+        self.get_conversation = get_conversation
+        self.metrics = metrics
+        self.stable_window = stable_window
+        self._last_interim = ""
+        self._timer: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self._snapshot: List[Dict] = []
+        self._started_at = 0.0
+
+    def on_interim(self, text: str):
+        """Re-arm the stability timer for a new interim transcript"""
+        normalized = normalize_transcript(text)
+        if not normalized or normalized == self._last_interim:
+            return
+        self._last_interim = normalized
+        self._cancel_timer()
+        if self._task and normalize_transcript(self._snapshot[-1]["content"]) != normalized:
+            self._cancel_task()
+        if not self._task:
+            self._timer = asyncio.create_task(self._start_when_stable(text))
+
+    async def _start_when_stable(self, text: str):
+        await asyncio.sleep(self.stable_window)
+        self._timer = None
+        self._snapshot = self.get_conversation() + [{"role": "user", "content": text}]
+        self._started_at = time.perf_counter()
+        self.metrics.started += 1
+        self._task = asyncio.create_task(self._run(self._snapshot))
+
+    async def _run(self, snapshot: List[Dict]):
+        response = await asyncio.to_thread(self.generate, snapshot)
+        return response, time.perf_counter()
+
+    async def resolve(self, conversation: List[Dict]) -> Optional[str]:
+        """
+        Commit the speculative response for the final conversation
+
+        Returns the response if the speculation matches the conversation
+        (ending with the final user message), otherwise None.
+        """
+        self._cancel_timer()
+        self._last_interim = ""
+        task, snapshot, started_at = self._task, self._snapshot, self._started_at
+        if task is None:
+            return None
+
+        matches = (
+            len(snapshot) == len(conversation)
+            and snapshot[:-1] == conversation[:-1]
+            and normalize_transcript(snapshot[-1]["content"]) == normalize_transcript(conversation[-1]["content"])
+        )
+        if not matches:
+            self._cancel_task()
+            return None
+
+        self._task = None
+        resolved_at = time.perf_counter()
+        try:
+            response, finished_at = await task
+        except Exception as e:
+            logger.warning("Speculative generation failed: %s", e)
+            self.metrics.misses += 1
+            return None
+        self.metrics.hits += 1
+        self.metrics.latency_saved_total += min(finished_at, resolved_at) - started_at
+        return response
+
+    def cancel(self):
+        """Drop any pending or running speculation"""
+        self._cancel_timer()
+        self._last_interim = ""
+        if self._task:
+            self._cancel_task()
+
+    def _cancel_timer(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def _cancel_task(self):
+        # The worker thread runs to completion; its result is discarded
+        self._task.cancel()
+        self._task = None
+        self.metrics.misses += 1
@@ -0,0 +1,233 @@
+from config import settings
+from models.tenant import TenantProfile
+from services.deepgram_service import DeepgramService
+from services.elevenlabs_service import ElevenLabsService
+from services.groq_service import GroqService
+from services.semantic_cache import SemanticResponseCache
+from utils.log import get_logger
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+import asyncio
+import json
+import time
+
+logger = get_logger("tenants")
+
+
+class UnknownTenantError(LookupError):
+    """No profile is configured for the requested tenant"""
+
+
+class TenantQuotaExceeded(Exception):
+    """The tenant already has its maximum number of concurrent sessions"""
+
+
+class TenantServices:
+    """Provider clients and caches of one tenant"""
+
+    def __init__(self, profile: TenantProfile, embedder=None):
+        self.profile = profile
+        self.deepgram = DeepgramService(
+            api_key=profile.deepgram_api_key or settings.deepgram_api_key,
+            model=profile.deepgram_model,
+            language=profile.deepgram_language,
+        )
+        self.groq = GroqService(
+            api_key=profile.groq_api_key or settings.groq_api_key,
+            model=profile.groq_model,
+            max_tokens=profile.groq_max_tokens,
+            temperature=profile.groq_temperature,
+        )
+        # Own instance, so pre-rendered phrases are cached in this tenant's voice
+        self.elevenlabs = ElevenLabsService(
+            api_key=profile.elevenlabs_api_key or settings.elevenlabs_api_key,
+            voice_id=profile.elevenlabs_voice_id,
+            model_id=profile.elevenlabs_model,
+        )
+        # Emergency triage and the cache's emergency exclusion only know English
+        # phrases, so a non-English tenant never gets cached replies
+        self.english = profile.deepgram_language.lower().startswith("en")
+        if not self.english:
+            logger.warning(
+                "Tenant %s uses language %r: emergency triage only matches English "
+                "and is unavailable, semantic cache disabled",
+                profile.tenant_id, profile.deepgram_language,
+            )
+        # Cached replies carry audio, so the cache is per tenant as well
+        self.semantic_cache = SemanticResponseCache(
+            embedder=embedder
+        ) if settings.semantic_cache_enabled and self.english else None
+        self.active_sessions = 0
+        self.last_used = time.monotonic()
+        self.warm_up_task: Optional[asyncio.Task] = None
+
+    async def warm_up(self):
+        """Validate the tenant's keys and pre-render its fixed phrases"""
+        checks = {
+            "deepgram": self.deepgram.warm_up,
+            "groq": self.groq.warm_up,
+            "elevenlabs": self.elevenlabs.warm_up,
+        }
+        results = await asyncio.gather(
+            *(asyncio.wait_for(check(), settings.readiness_timeout) for check in checks.values()),
+            return_exceptions=True,
+        )
+        errors = {
+            name: str(result) or type(result).__name__
+            for name, result in zip(checks, results) if isinstance(result, Exception)
+        }
+        if errors:
+            logger.error("Warm-up failed for tenant %s", self.profile.tenant_id, extra={"errors": errors})
+        else:
+            logger.info("Warmed up tenant %s", self.profile.tenant_id)
+
+    async def close(self):
+        """Stop a running warm-up and close the provider clients"""
+        if self.warm_up_task and not self.warm_up_task.done():
+            self.warm_up_task.cancel()
+        try:
+            self.groq.close()
+            self.elevenlabs.close()
+            await self.deepgram.close()
+        except Exception as e:
+            logger.warning("Error closing clients of tenant %s: %s", self.profile.tenant_id, e)
+
+
+class TenantRegistry:
+    """
+    Tenant profiles and their pooled provider clients
+
+    Profiles are held in a dict keyed by tenant id, so resolving the tenant
+    of a new session is a single lookup. Each tenant's services (provider
+    clients, TTS phrase cache, semantic cache) are created on its first
+    session, warmed up in the background like the default tenant's at
+    startup, and kept in an LRU pool. Tenants without active sessions are
+    evicted (and their clients closed) once idle for `idle_ttl` seconds or
+    when the pool grows past `pool_size`; the default tenant is never
+    evicted. `run_eviction` applies the TTL in the background, so idle
+    tenants are released without new sessions. `checkout` enforces the
+    tenant's concurrent-session quota.
+    """
+
+    def __init__(
+        self,
+        profiles: Dict[str, TenantProfile],
+        default_tenant: str = settings.default_tenant,
+        pool_size: int = settings.tenant_pool_size,
+        idle_ttl: float = settings.tenant_idle_ttl,
+    ):
+        self.profiles = dict(profiles)
+        self.profiles.setdefault(default_tenant, TenantProfile(tenant_id=default_tenant))
+        self.default_tenant = default_tenant
+        self.pool_size = pool_size
+        self.idle_ttl = idle_ttl
+        self.default = TenantServices(self.profiles[default_tenant])
+        self._pool: "OrderedDict[str, TenantServices]" = OrderedDict()
+        self._closing = set()
+        self.created = 0
+        self.evicted = 0
+        self.rejected = 0
+
+    @classmethod
+    def load(cls, path: str = settings.tenant_profiles_path, **kwargs) -> "TenantRegistry":
+        """Read profiles from a JSON file (no path: default tenant only)"""
+        profiles = {}
+        if path:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+            for tenant_id, fields in data.items():
+                profiles[tenant_id] = TenantProfile(tenant_id=tenant_id, **fields)
+            logger.info("Loaded %d tenant profile(s)", len(profiles))
+        return cls(profiles, **kwargs)
+
+    def resolve(self, tenant_id: Optional[str]) -> TenantProfile:
+        """Profile of a tenant (None selects the default tenant)"""
+        profile = self.profiles.get(tenant_id or self.default_tenant)
+        if profile is None:
+            raise UnknownTenantError(tenant_id)
+        return profile
+
+    def services(self, tenant_id: Optional[str]) -> TenantServices:
+        """Services of a tenant, created on first use"""
+        profile = self.resolve(tenant_id)
+        if profile.tenant_id == self.default_tenant:
+            return self.default
+        services = self._pool.get(profile.tenant_id)
+        if services is None:
+            services = TenantServices(profile, embedder=self._embedder())
+            self._pool[profile.tenant_id] = services
+            self.created += 1
+            logger.info("Created clients for tenant %s", profile.tenant_id)
+        else:
+            self._pool.move_to_end(profile.tenant_id)
+        return services
+
+    def _embedder(self):
+        cache = self.default.semantic_cache
+        return cache.embedder if cache else None
+
+    def checkout(self, tenant_id: Optional[str]) -> TenantServices:
+        """Reserve a session slot for a tenant and return its services"""
+        services = self.services(tenant_id)
+        quota = services.profile.max_sessions
+        if quota and services.active_sessions >= quota:
+            self.rejected += 1
+            raise TenantQuotaExceeded(services.profile.tenant_id)
+        services.active_sessions += 1
+        services.last_used = time.monotonic()
+        if services is not self.default and services.warm_up_task is None:
+            services.warm_up_task = asyncio.create_task(
+                services.warm_up(), name=f"warm_up_{services.profile.tenant_id}"
+            )
+        self._evict()
+        return services
+
+    def release(self, services: TenantServices):
+        """Free the session slot taken by `checkout`"""
+        services.active_sessions -= 1
+        services.last_used = time.monotonic()
+        self._evict()
+
+    def _evict(self):
+        """Drop idle tenants past their TTL, then least recently used ones over the pool size"""
+        now = time.monotonic()
+        idle = [tid for tid, s in self._pool.items() if s.active_sessions == 0]
+        for tenant_id in idle:
+            if len(self._pool) <= self.pool_size and now - self._pool[tenant_id].last_used < self.idle_ttl:
+                continue
+            services = self._pool.pop(tenant_id)
+            self.evicted += 1
+            logger.info("Evicted clients for idle tenant %s", tenant_id)
+            task = asyncio.create_task(services.close())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def run_eviction(self):
+        """Evict idle tenants periodically (run as a background task)"""
+        while True:
+            await asyncio.sleep(max(1.0, min(60.0, self.idle_ttl)))
+            self._evict()
+
+    async def close(self):
+        """Close the clients of every tenant (on shutdown)"""
+        pooled = list(self._pool.values())
+        self._pool.clear()
+        await asyncio.gather(*(services.close() for services in [self.default, *pooled]), *self._closing)
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        return {
+            "profiles": len(self.profiles),
+            "pooled": len(self._pool),
+            "created": self.created,
+            "evicted": self.evicted,
+            "rejected": self.rejected,
+            "tenants": {
+                s.profile.tenant_id: {
+                    "active_sessions": s.active_sessions,
+                    "max_sessions": s.profile.max_sessions,
+                    "idle_s": round(now - s.last_used) if not s.active_sessions else 0,
+                }
+                for s in [self.default, *self._pool.values()]
+            },
+        }
@@ -0,0 +1,338 @@
+from config import settings
+from models.medical import MedicalSummary
+from pydantic import ValidationError
+from utils.log import get_logger
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import asyncio
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+
+logger = get_logger("store")
+
+
+class TranscriptStore:
+    """
+    Write-behind persistence for transcripts and medical summaries
+
+    Records are appended to an in-memory batch on the hot path and flushed
+    by a background task. Each flush is a group commit: the whole batch is
+    written to one fsynced JSONL segment, applied to SQLite (WAL mode) in a
+    single transaction, and the segment is then deleted. A batch that fails
+    to apply goes back to the pending batch, and its segment is kept until
+    the retry commits. Segments left on disk by a crash are replayed into
+    SQLite on startup; one that cannot be replayed is renamed to
+    "*.jsonl.failed" and skipped.
+    """
+
+    def __init__(
+        self,
+        db_path: str = settings.transcript_db_path,
+        segment_dir: str = settings.transcript_segment_dir,
+        flush_interval: float = settings.transcript_flush_interval,
+        batch_size: int = settings.transcript_flush_batch_size,
+    ):
+        self.db_path = Path(db_path)
+        self.segment_dir = Path(segment_dir)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: List[Dict] = []
+        self._flush_event = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._db_lock = threading.Lock()
+        self._segment_counter = itertools.count()
+        # Segments whose batch failed to apply and was put back into _pending
+        self._unapplied: List[Path] = []
+        self._db: Optional[sqlite3.Connection] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Open the database, replay leftover segments and start flushing"""
+        await asyncio.to_thread(self._open)
+        recovered = await asyncio.to_thread(self._recover_segments)
+        if recovered:
+            logger.warning("Recovered %d unflushed segment(s)", recovered)
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Flush everything still pending and close the database"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+        if self._db:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    def _open(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                started_at TEXT,
+                ended_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                timestamp TEXT,
+                PRIMARY KEY (session_id, seq)
+            );
+            CREATE TABLE IF NOT EXISTS summaries (
+                session_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                created_at TEXT
+            );
+        """)
+        self._db.commit()
+
+    # ------------------------------------------------------------------
+    # Hot path (non-blocking)
+    # ------------------------------------------------------------------
+
+    def record_session(
+        self,
+        session_id: str,
+        started_at: Optional[str] = None,
+        ended_at: Optional[str] = None
+    ):
+        """Queue a session start/end record"""
+        self._enqueue({
+            "kind": "session",
+            "session_id": session_id,
+            "started_at": started_at,
+            "ended_at": ended_at,
+        })
+
+    def append_message(self, session_id: str, seq: int, role: str, content: str, timestamp: str):
+        """Queue a single conversation message"""
+        self._enqueue({
+            "kind": "message",
+            "session_id": session_id,
+            "seq": seq,
+            "role": role,
+            "content": content,
+            "timestamp": timestamp,
+        })
+
+    def save_summary(self, session_id: str, summary: Dict):
+        """Queue the medical summary generated for a session"""
+        self._enqueue({
+            "kind": "summary",
+            "session_id": session_id,
+            "data": summary,
+            "created_at": datetime.now().isoformat(),
+        })
+
+    def _enqueue(self, record: Dict):
+        self._pending.append(record)
+        if len(self._pending) >= self.batch_size:
+            self._flush_event.set()
+
+    # ------------------------------------------------------------------
+    # Group commit
+    # ------------------------------------------------------------------
+
+    async def _flush_loop(self):
+        """Flush the pending batch every interval or when it fills up"""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            try:
+                await self.flush()
+            except Exception:
+                # Never let one bad flush stop persistence for the process
+                logger.exception("Flush failed")
+
+    async def flush(self):
+        """Commit the current batch to disk"""
+        async with self._flush_lock:
+            if not self._pending or not self._db:
+                return
+            batch, self._pending = self._pending, []
+            try:
+                await asyncio.to_thread(self._commit_batch, batch)
+            except OSError as e:
+                # Segment could not be written - keep the records for the next attempt
+                logger.error("Segment write failed, retrying later: %s", e)
+                self._pending[:0] = batch
+            except sqlite3.Error as e:
+                # e.g. "database is locked" - the segment stays on disk until the retry commits
+                logger.error("Database apply failed, retrying later: %s", e)
+                self._pending[:0] = batch
+            except Exception:
+                logger.exception("Batch commit failed, retrying later")
+                # Keep the batch, minus records that can never be written
+                self._pending[:0] = [r for r in batch if self._serializable(r)]
+
+    @staticmethod
+    def _serializable(record: Dict) -> bool:
+        try:
+            json.dumps(record)
+            return True
+        except (TypeError, ValueError):
+            logger.error("Dropping unserializable %s record", record.get("kind"),
+                         extra={"session": record.get("session_id")})
+            return False
+
+    def _commit_batch(self, batch: List[Dict]):
+        segment = self._write_segment(batch)
+        try:
+            self._apply(batch)
+        except sqlite3.Error:
+            self._unapplied.append(segment)
+            raise
+        # A successful commit includes every batch that was put back after a failure
+        for path in [segment, *self._unapplied]:
+            path.unlink(missing_ok=True)
+        self._unapplied.clear()
+
+    def _write_segment(self, batch: List[Dict]) -> Path:
+        name = f"segment-{time.time_ns():020d}-{next(self._segment_counter):06d}.jsonl"
+        path = self.segment_dir / name
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in batch))
+            f.flush()
+            os.fsync(f.fileno())
+        return path
+
+    def _apply(self, batch: List[Dict]):
+        """Apply records to SQLite in one transaction (idempotent, safe to replay)"""
+        with self._db_lock, self._db:
+            for record in batch:
+                kind = record.get("kind")
+                if kind == "message":
+                    self._db.execute(
+                        "INSERT OR IGNORE INTO messages (session_id, seq, role, content, timestamp) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (record["session_id"], record["seq"], record["role"],
+                         record["content"], record["timestamp"]),
+                    )
+                elif kind == "session":
+                    self._db.execute(
+                        "INSERT INTO sessions (session_id, started_at, ended_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT(session_id) DO UPDATE SET "
+                        "started_at = COALESCE(excluded.started_at, started_at), "
+                        "ended_at = COALESCE(excluded.ended_at, ended_at)",
+                        (record["session_id"], record["started_at"], record["ended_at"]),
+                    )
+                elif kind == "summary":
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO summaries (session_id, data, created_at) VALUES (?, ?, ?)",
+                        (record["session_id"], json.dumps(record["data"]), record["created_at"]),
+                    )
+
+    def _recover_segments(self) -> int:
+        """Replay segments that were written but never applied to SQLite"""
+        recovered = 0
+        for segment in sorted(self.segment_dir.glob("segment-*.jsonl")):
+            try:
+                batch = []
+                with open(segment, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            batch.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            # Torn tail from a crash mid-write
+                            break
+                self._apply(batch)
+            except Exception:
+                # Set it aside for manual inspection instead of failing startup
+                quarantined = segment.with_name(segment.name + ".failed")
+                logger.exception("Could not replay %s, moved to %s", segment.name, quarantined.name)
+                segment.rename(quarantined)
+                continue
+            segment.unlink(missing_ok=True)
+            recovered += 1
+        return recovered
+
+    # ------------------------------------------------------------------
+    # Query API
+    # ------------------------------------------------------------------
+
+    async def get_transcript(self, session_id: str) -> List[Dict]:
+        """Get the persisted transcript of a session, oldest message first"""
+        await self.flush()
+        return await asyncio.to_thread(self._query_transcript, session_id)
+
+    async def get_summary(self, session_id: str) -> Optional[MedicalSummary]:
+        """Get the persisted medical summary of a session, if valid"""
+        await self.flush()
+        data = await asyncio.to_thread(self._query_summary, session_id)
+        if data is None:
+            return None
+        try:
+            return MedicalSummary.model_validate(data)
+        except ValidationError:
+            return None
+
+    async def get_session(self, session_id: str) -> Optional[Dict]:
+        """Get session metadata, transcript and summary in one call"""
+        await self.flush()
+        meta = await asyncio.to_thread(self._query_session, session_id)
+        if meta is None:
+            return None
+        summary = await self.get_summary(session_id)
+        return {
+            **meta,
+            "transcript": await self.get_transcript(session_id),
+            "summary": summary.model_dump() if summary else None,
+        }
+
+    async def list_sessions(self) -> List[str]:
+        """Get the ids of all persisted sessions"""
+        await self.flush()
+        return await asyncio.to_thread(self._query_session_ids)
+
+    def _query_transcript(self, session_id: str) -> List[Dict]:
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT role, content, timestamp FROM messages WHERE session_id = ? ORDER BY seq",
+                (session_id,),
+            ).fetchall()
+        return [{"role": r[0], "content": r[1], "timestamp": r[2]} for r in rows]
+
+    def _query_summary(self, session_id: str) -> Optional[Dict]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT data FROM summaries WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _query_session(self, session_id: str) -> Optional[Dict]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT session_id, started_at, ended_at FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"session_id": row[0], "started_at": row[1], "ended_at": row[2]}
+
+    def _query_session_ids(self) -> List[str]:
+        with self._db_lock:
+            rows = self._db.execute("SELECT session_id FROM sessions ORDER BY started_at").fetchall()
+        return [r[0] for r in rows]
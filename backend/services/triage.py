@@ -0,0 +1,172 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+import re
+
+
+# Curated emergency lexicon (phrase -> category), expanding the emergencies
+# listed in the system prompt's IMPORTANT RULES
+EMERGENCY_LEXICON: Dict[str, str] = {
+    # Cardiac
+    "chest pain": "cardiac",
+    "chest pressure": "cardiac",
+    "chest tightness": "cardiac",
+    "tightness in my chest": "cardiac",
+    "pain in my chest": "cardiac",
+    "pressure in my chest": "cardiac",
+    "heart attack": "cardiac",
+    # Respiratory
+    "can't breathe": "respiratory",
+    "cannot breathe": "respiratory",
+    "can not breathe": "respiratory",
+    "trouble breathing": "respiratory",
+    "breathing trouble": "respiratory",
+    "difficulty breathing": "respiratory",
+    "hard to breathe": "respiratory",
+    "short of breath": "respiratory",
+    "shortness of breath": "respiratory",
+    "can't catch my breath": "respiratory",
+    "choking": "respiratory",
+    # Bleeding
+    "severe bleeding": "bleeding",
+    "bleeding heavily": "bleeding",
+    "bleeding a lot": "bleeding",
+    "won't stop bleeding": "bleeding",
+    "coughing up blood": "bleeding",
+    "vomiting blood": "bleeding",
+    # Stroke signs
+    "stroke": "stroke",
+    "face drooping": "stroke",
+    "face is drooping": "stroke",
+    "slurred speech": "stroke",
+    "slurring my words": "stroke",
+    "numb on one side": "stroke",
+    "can't move my arm": "stroke",
+    # Other
+    "passed out": "neurological",
+    "unconscious": "neurological",
+    "seizure": "neurological",
+    "overdose": "poisoning",
+    "kill myself": "self_harm",
+    "suicidal": "self_harm",
+}
+
+# Pre-negation triggers (NegEx style). "never" is deliberately absent: "never
+# felt chest pain this bad" reports an emergency, and a missed alert costs far
+# more than a false one.
+NEGATION_TERMS = {
+    "no", "not", "without", "denies", "deny", "denied",
+    "don't", "dont", "doesn't", "doesnt", "didn't", "didnt",
+    "isn't", "wasn't", "haven't", "hasn't", "hadn't", "aren't", "weren't",
+}
+
+# Words allowed between a trigger and the phrase it negates ("don't have any
+# chest pain", "not having chest pain"); any other word ends the scope
+_NEGATION_FILLERS = {
+    "have", "has", "had", "having", "any", "a", "an", "my", "some",
+    "feel", "feeling", "felt", "get", "getting", "got", "experience", "experiencing", "been",
+}
+
+# Tokens that end the scope of a preceding negation
+_SCOPE_BREAKERS = {"but", "however", "although", "except", "now", "and", "or", "with"}
+_CLAUSE_RE = re.compile(r"[.,;:!?]")
+_TOKEN_RE = re.compile(r"[a-z']+")
+
+
+class AhoCorasick:
+    """Compiled multi-pattern matcher over lowercase text"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for pattern in patterns:
+            self._add(pattern)
+        self._build()
+
+    def _add(self, pattern: str):
+        node = 0
+        for char in pattern:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = nxt
+        self._output[node].append(pattern)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                if self._fail[child] == child:
+                    self._fail[child] = 0
+                self._output[child] += self._output[self._fail[child]]
+
+    def find(self, text: str) -> List[Tuple[int, str]]:
+        """Return (start_index, pattern) for every occurrence in text"""
+        matches = []
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for pattern in output[node]:
+                matches.append((i - len(pattern) + 1, pattern))
+        return matches
+
+
+@dataclass
+class TriageResult:
+    """An emergency phrase found in a transcript"""
+    phrase: str
+    category: str
+
+
+class EmergencyTriage:
+    """
+    Local emergency detection for transcripts
+
+    Runs an Aho-Corasick automaton over the lexicon, keeps only matches on
+    word boundaries, and discards matches directly governed by a negation
+    ("I don't have chest pain", but not "I have no fever and chest pain" or
+    "she doesn't know I have chest pain"). When in doubt it alerts.
+    """
+
+    def __init__(self, lexicon: Dict[str, str] = EMERGENCY_LEXICON, negation_window: int = 4):
+        self.lexicon = {phrase.lower(): category for phrase, category in lexicon.items()}
+        self.negation_window = negation_window
+        self.matcher = AhoCorasick(self.lexicon)
+
+    def check(self, text: str) -> Optional[TriageResult]:
+        """Return the first non-negated emergency phrase in text, if any"""
+        lowered = text.lower().replace("’", "'")
+        for start, phrase in self.matcher.find(lowered):
+            end = start + len(phrase)
+            if start > 0 and lowered[start - 1].isalnum():
+                continue
+            if end < len(lowered) and lowered[end].isalnum():
+                continue
+            if self._is_negated(lowered, start):
+                continue
+            return TriageResult(phrase=phrase, category=self.lexicon[phrase])
+        return None
+
+    def _is_negated(self, text: str, start: int) -> bool:
+        clause = _CLAUSE_RE.split(text[:start])[-1]
+        tokens = _TOKEN_RE.findall(clause)[-self.negation_window:]
+        for token in reversed(tokens):
+            if token in NEGATION_TERMS:
+                return True
+            if token in _SCOPE_BREAKERS or token not in _NEGATION_FILLERS:
+                return False
+        return False
@@ -0,0 +1,39 @@
+import asyncio
+import json
+
+from services.batch_summarizer import BatchSummarizer
+
+SUMMARY = {
+    "chief_complaint": "headache",
+    "history_of_present_illness": "two days",
+    "relevant_history": [],
+    "assessment": "tension headache",
+    "recommendations": ["rest"],
+}
+TRANSCRIPTS = [("s1", [{"role": "user", "content": "I have a headache"}])]
+
+
+class FakeGroq:
+    def __init__(self, model):
+        self.model = model
+        self.calls = 0
+
+    def request_summary(self, conversation):
+        self.calls += 1
+        return SUMMARY
+
+
+def run(groq, output):
+    summarizer = BatchSummarizer(groq, str(output), requests_per_minute=6000)
+    return asyncio.run(summarizer.run(TRANSCRIPTS))
+
+
+def test_resume_skips_only_same_configuration(tmp_path):
+    output = tmp_path / "summaries.jsonl"
+    assert run(FakeGroq("model-a"), output).succeeded == 1
+    assert run(FakeGroq("model-a"), output).skipped == 1
+    assert run(FakeGroq("model-b"), output).succeeded == 1
+
+    # Records written before prompt hashes existed are regenerated too
+    output.write_text(json.dumps({"session_id": "s1", "model": "model-a", "summary": SUMMARY}) + "\n")
+    assert run(FakeGroq("model-a"), output).succeeded == 1
@@ -0,0 +1,27 @@
+import io
+import json
+import logging
+
+from utils.log import setup_logging, stop_logging
+
+
+def test_records_capture_values_at_call_time():
+    stream = io.StringIO()
+    setup_logging(level="INFO", json_format=True, stream=stream)
+    try:
+        logger = logging.getLogger("medivoice.test")
+        items = ["a"]
+        checks = {"groq": "pending"}
+        logger.info("items=%s", items, extra={"checks": checks})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+        items.append("b")
+        checks["groq"] = "ok"
+    finally:
+        stop_logging()
+    first, second = (json.loads(line) for line in stream.getvalue().splitlines()[:2])
+    assert first["msg"] == "items=['a']"
+    assert first["checks"] == {"groq": "pending"}
+    assert "ValueError: boom" in second["exc"]
@@ -0,0 +1,29 @@
+import asyncio
+
+from services.readiness import ReadinessProbe
+
+
+def test_failed_checks_are_retried_until_ready():
+    calls = {"flaky": 0, "ok": 0}
+
+    async def flaky():
+        calls["flaky"] += 1
+        if calls["flaky"] < 3:
+            raise RuntimeError("provider unavailable")
+
+    async def ok():
+        calls["ok"] += 1
+
+    async def run():
+        probe = ReadinessProbe(timeout=1.0, retry_delay=0.01)
+        probe.add_check("flaky", flaky)
+        probe.add_check("ok", ok)
+        task = asyncio.create_task(probe.run())
+        await asyncio.sleep(0.005)
+        assert probe.status()["status"] == "not_ready"
+        assert await asyncio.wait_for(task, 1.0)
+        return probe
+
+    probe = asyncio.run(run())
+    assert probe.status()["status"] == "ready"
+    assert calls == {"flaky": 3, "ok": 1}
@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+from services.groq_service import FALLBACK_RESPONSE
+from services.semantic_cache import SemanticResponseCache
+
+
+def conversation(*user_turns):
+    return [{"role": "user", "content": turn} for turn in user_turns]
+
+
+@pytest.mark.parametrize("text", [
+    "I think I passed out this morning",
+    "I had a seizure yesterday",
+    "I have no fever and chest pain",
+])
+def test_emergencies_are_not_cacheable(text):
+    cache = SemanticResponseCache()
+    assert asyncio.run(cache.key(conversation(text))) is None
+
+
+def test_fallback_reply_is_not_stored():
+    cache = SemanticResponseCache()
+    key = asyncio.run(cache.key(conversation("I have a headache")))
+    cache.store(key, FALLBACK_RESPONSE, b"audio")
+    assert cache.lookup(key) is None
+    cache.store(key, "Sorry to hear that.", b"audio")
+    assert cache.lookup(key).response == "Sorry to hear that."
@@ -0,0 +1,12 @@
+import pytest
+
+from config import settings
+from models.tenant import TenantProfile
+from services.tenants import TenantServices
+
+
+@pytest.mark.parametrize("language, cached", [("en", True), ("en-US", True), ("es", False), ("multi", False)])
+def test_semantic_cache_only_for_english_tenants(monkeypatch, language, cached):
+    monkeypatch.setattr(settings, "semantic_cache_enabled", True)
+    services = TenantServices(TenantProfile(tenant_id="clinic", deepgram_language=language))
+    assert (services.semantic_cache is not None) == cached
@@ -0,0 +1,52 @@
+import asyncio
+import sqlite3
+
+from services.transcript_store import TranscriptStore
+
+
+def make_store(tmp_path):
+    return TranscriptStore(db_path=str(tmp_path / "t.db"), segment_dir=str(tmp_path / "segments"))
+
+
+def test_failed_apply_is_retried(tmp_path):
+    async def run():
+        store = make_store(tmp_path)
+        await store.start()
+        apply = store._apply
+        calls = []
+
+        def flaky(batch):
+            calls.append(len(batch))
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            apply(batch)
+
+        store._apply = flaky
+        store.record_session("s1", started_at="now")
+        store.append_message("s1", 0, "user", "hello", "now")
+        await store.flush()
+        assert len(list((tmp_path / "segments").iterdir())) == 1
+        assert await store.list_sessions() == ["s1"]
+        assert [m["content"] for m in await store.get_transcript("s1")] == ["hello"]
+        assert list((tmp_path / "segments").iterdir()) == []
+        await store.stop()
+
+    asyncio.run(run())
+
+
+def test_bad_segment_is_quarantined(tmp_path):
+    segments = tmp_path / "segments"
+    segments.mkdir()
+    (segments / "segment-1.jsonl").write_text('{"kind": "message"}\n')
+    (segments / "segment-2.jsonl").write_text(
+        '{"kind": "session", "session_id": "s2", "started_at": "now", "ended_at": null}\n'
+    )
+
+    async def run():
+        store = make_store(tmp_path)
+        await store.start()
+        assert await store.list_sessions() == ["s2"]
+        await store.stop()
+
+    asyncio.run(run())
+    assert sorted(p.name for p in segments.iterdir()) == ["segment-1.jsonl.failed"]
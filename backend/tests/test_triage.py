@@ -0,0 +1,38 @@
+import pytest
+
+from services.triage import EmergencyTriage
+
+triage = EmergencyTriage()
+
+
+@pytest.mark.parametrize("text, phrase", [
+    ("I have chest pain", "chest pain"),
+    ("I have no fever and chest pain", "chest pain"),
+    ("I have never felt chest pain this bad", "chest pain"),
+    ("I never had chest pain like this before", "chest pain"),
+    ("my wife does not know I have chest pain", "chest pain"),
+    ("i haven't eaten and i passed out", "passed out"),
+    ("no, I can't breathe", "can't breathe"),
+    ("it's not just a headache, I had a seizure", "seizure"),
+    ("I don't have a fever but I have chest pain", "chest pain"),
+    ("no cough or shortness of breath", "shortness of breath"),
+])
+def test_alerts(text, phrase):
+    result = triage.check(text)
+    assert result is not None and result.phrase == phrase
+
+
+@pytest.mark.parametrize("text", [
+    "I don't have chest pain",
+    "I do not have any chest pain",
+    "not having chest pain anymore",
+    "no chest pain",
+    "patient denies chest pain",
+    "I haven't passed out",
+    "I'm not short of breath",
+    "without shortness of breath",
+    "I have a mild headache",
+    "my strokes of luck",
+])
+def test_no_alert(text):
+    assert triage.check(text) is None
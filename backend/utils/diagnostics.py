@@ -0,0 +1,173 @@
+"""
+Event-loop health and hot-path profiling
+
+LoopMonitor runs a heartbeat coroutine on the event loop and a watchdog
+thread beside it. The coroutine measures timer lag; the watchdog notices
+when the heartbeat stops (the loop is blocked), snapshots the loop thread's
+stack and the task that is running, and records a slow-callback event once
+the loop recovers. SamplingProfiler samples thread stacks at a fixed rate
+and renders them in the folded format used by flamegraph.pl and speedscope.
+"""
+from collections import Counter, deque
+from typing import Dict, List, Optional
+import asyncio
+import os
+import sys
+import threading
+import time
+
+from utils.log import get_logger
+
+logger = get_logger("diagnostics")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _stack(frame) -> List:
+    """Frames of a stack, outermost first"""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def _is_app_frame(frame) -> bool:
+    filename = frame.f_code.co_filename
+    return filename.startswith(BACKEND_DIR) and "site-packages" not in filename
+
+
+class LoopMonitor:
+    """Event-loop lag monitor with slow-callback attribution"""
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        slow_threshold: float = 0.1,
+        history: int = 100,
+    ):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.lags = deque(maxlen=1200)
+        self.slow_callbacks = deque(maxlen=history)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._stall: Optional[Dict] = None
+
+    def start(self):
+        """Start monitoring the running loop"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._beat(), name="loop_monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _beat(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            self.lags.append(now - start - self.interval)
+
+    def _watch(self):
+        while not self._stopped.wait(self.slow_threshold / 4):
+            blocked_for = time.monotonic() - self._heartbeat - self.interval
+            if blocked_for >= self.slow_threshold:
+                if self._stall is None:
+                    self._stall = self._snapshot()
+            elif self._stall is not None:
+                self._finish_stall()
+
+    def _snapshot(self) -> Dict:
+        """Capture what the loop thread is doing right now"""
+        stall = {"started_at": self._heartbeat, "task": None, "coroutine": None, "blocking_call": None, "stack": []}
+        task = asyncio.current_task(self._loop) if self._loop else None
+        if task is not None:
+            stall["task"] = task.get_name()
+            coro = task.get_coro()
+            stall["coroutine"] = getattr(coro, "__qualname__", repr(coro))
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is not None:
+            frames = _stack(frame)
+            app_frames = [f for f in frames if _is_app_frame(f)]
+            if app_frames:
+                stall["blocking_call"] = _frame_label(app_frames[-1])
+            stall["stack"] = [_frame_label(f) for f in frames[-15:]]
+        return stall
+
+    def _finish_stall(self):
+        stall, self._stall = self._stall, None
+        duration = self._heartbeat - stall.pop("started_at") - self.interval
+        event = {"at": time.time(), "duration_ms": round(duration * 1000), **stall}
+        self.slow_callbacks.append(event)
+        logger.warning(
+            "Event loop blocked for %d ms by %s",
+            event["duration_ms"], event["coroutine"] or event["task"] or "unknown",
+            extra={"blocking_call": event["blocking_call"]}
+        )
+
+    def stats(self) -> Dict:
+        lags = sorted(self.lags)
+        if lags:
+            p50 = lags[len(lags) // 2]
+            p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+        else:
+            p50 = p99 = 0.0
+        return {
+            "lag_ms": {
+                "last": round(self.lags[-1] * 1000, 2) if self.lags else 0.0,
+                "p50": round(p50 * 1000, 2),
+                "p99": round(p99 * 1000, 2),
+                "max": round(lags[-1] * 1000, 2) if lags else 0.0,
+            },
+            "blocked_now_ms": round(max(0.0, time.monotonic() - self._heartbeat - self.interval) * 1000),
+            "slow_callbacks": list(self.slow_callbacks),
+        }
+
+
+class SamplingProfiler:
+    """Statistical profiler producing folded stacks ("a;b;c count" lines)"""
+
+    def __init__(self, thread_id: Optional[int] = None):
+        self.thread_id = thread_id
+
+    def run(self, seconds: float, hz: float = 100.0) -> str:
+        """Sample for `seconds` and return folded stacks (blocks the calling thread)"""
+        counts: Counter = Counter()
+        own_id = threading.get_ident()
+        period = 1.0 / hz
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.thread_id is not None and thread_id != self.thread_id):
+                    continue
+                folded = ";".join(
+                    f"{f.f_code.co_name} ({os.path.basename(f.f_code.co_filename)})" for f in _stack(frame)
+                )
+                counts[folded] += 1
+            time.sleep(period)
+        return "\n".join(f"{stack} {count}" for stack, count in counts.most_common()) + "\n"
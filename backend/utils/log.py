@@ -0,0 +1,203 @@
+"""
+Structured, non-blocking logging
+
+Records are filtered (sampling, rate limiting) and tagged with the current
+session id on the emitting thread, which also renders the message, snapshots
+`extra` containers and formats tracebacks, so later mutation of logged
+objects cannot change what is written. The records are then handed to a
+bounded queue; a background QueueListener thread formats them as JSON lines
+and writes them out, so the event loop never blocks on stdout.
+"""
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+
+
+session_id_var: ContextVar[Optional[str]] = ContextVar("session_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "session_id"}
+
+_EXC_FORMATTER = logging.Formatter()
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def bind_session(session_id: Optional[str]):
+    """Attach a session id to all log records from the current context"""
+    return session_id_var.set(session_id)
+
+
+def get_logger(category: str) -> logging.Logger:
+    """Logger for a category (e.g. "deepgram.keepalive")"""
+    return logging.getLogger(f"medivoice.{category}")
+
+
+class SessionContextFilter(logging.Filter):
+    """Copy the session id from the context into the record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.session_id = session_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Per-category sampling and rate limiting
+
+    Categories are logger names; the longest configured prefix applies.
+    Sampling keeps a random fraction of records; rate limiting is a token
+    bucket of N records per second. Warnings and errors always pass.
+    """
+
+    def __init__(self, sample_rates: Dict[str, float], rate_limits: Dict[str, float]):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self.rate_limits = rate_limits
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    @staticmethod
+    def _lookup(name: str, table: Dict[str, float]) -> Optional[str]:
+        best = None
+        for prefix in table:
+            if (name == prefix or name.startswith(prefix + ".")) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return best
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        name = record.name.removeprefix("medivoice.")
+
+        prefix = self._lookup(name, self.sample_rates)
+        if prefix is not None and random.random() >= self.sample_rates[prefix]:
+            self.dropped += 1
+            return False
+
+        prefix = self._lookup(name, self.rate_limits)
+        if prefix is not None and not self._take_token(prefix, self.rate_limits[prefix]):
+            self.dropped += 1
+            return False
+        return True
+
+    def _take_token(self, prefix: str, rate: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(prefix, (rate, now))
+            tokens = min(rate, tokens + (now - last) * rate)
+            if tokens < 1:
+                self._buckets[prefix] = [tokens, now]
+                return False
+            self._buckets[prefix] = [tokens - 1, now]
+            return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Capture values at call time; only JSON encoding is left to the writer thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and isinstance(value, (dict, list, set)):
+                try:
+                    setattr(record, key, copy.deepcopy(value))
+                except Exception:
+                    setattr(record, key, repr(value))
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        session_id = getattr(record, "session_id", None)
+        if session_id:
+            entry["session_id"] = session_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(
+    level: str = "INFO",
+    json_format: bool = True,
+    sample_rates: Optional[Dict[str, float]] = None,
+    rate_limits: Optional[Dict[str, float]] = None,
+    queue_size: int = 10000,
+    stream=None,
+) -> DroppingQueueHandler:
+    """Install the queue-based pipeline on the root logger"""
+    global _listener
+    stop_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if json_format:
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(name)s - %(session_id)s - %(message)s"))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    handler = DroppingQueueHandler(log_queue)
+    # Sample first so dropped records cost as little as possible
+    handler.addFilter(SamplingFilter(sample_rates or {}, rate_limits or {}))
+    handler.addFilter(SessionContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return handler
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -67,6 +67,19 @@ export function useVoiceAgent() {
           }
           break;
 
+        case 'emergency':
+          // Local triage alert; its audio follows as a regular 'audio' message
+          if (message.text) {
+            const emergencyId = generateMessageId();
+            setConversation(prev => [...prev, {
+              id: emergencyId,
+              role: 'assistant',
+              content: message.text!,
+              timestamp: new Date(),
+            }]);
+          }
+          break;
+
         case 'audio':
           if (message.data && typeof message.data === 'string') {
             playAudio(message.data);
@@ -26,7 +26,7 @@ export interface MedicalSummary {
 }
 
 export interface WSMessage {
-  type: 'transcript' | 'response' | 'audio' | 'status' | 'summary' | 'error';
+  type: 'transcript' | 'response' | 'audio' | 'status' | 'summary' | 'error' | 'emergency';
   text?: string;
   is_final?: boolean;
   data?: string | MedicalSummary;